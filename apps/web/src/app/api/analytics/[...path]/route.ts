@@ -62,6 +62,12 @@ async function handler(
     headers["Content-Type"] = contentType;
   }
 
+  // Forward conditional GETs so unchanged data comes back as 304
+  const ifNoneMatch = request.headers.get("if-none-match");
+  if (ifNoneMatch && request.method === "GET") {
+    headers["If-None-Match"] = ifNoneMatch;
+  }
+
   const fetchOptions: RequestInit = {
     method: request.method,
     headers,
@@ -112,12 +118,25 @@ async function handler(
     });
   }
 
+  const cacheHeaders: Record<string, string> = {};
+  for (const name of ["ETag", "Cache-Control"]) {
+    const value = response.headers.get(name);
+    if (value) {
+      cacheHeaders[name] = value;
+    }
+  }
+
+  if (response.status === 304) {
+    return new NextResponse(null, { status: 304, headers: cacheHeaders });
+  }
+
   // Standard JSON response
   const data = await response.text();
   return new NextResponse(data, {
     status: response.status,
     headers: {
       "Content-Type": respContentType || "application/json",
+      ...cacheHeaders,
     },
   });
 }
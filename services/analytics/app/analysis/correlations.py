@@ -1,13 +1,35 @@
 """Correlation analysis module (multi-user)."""
 
+import weakref
 from datetime import date
 from typing import Any
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from psycopg.rows import tuple_row
 from scipy import stats
 
+from app.analysis.cache import TTLCache
 from app.db import get_db_for_user
+from app.settings import settings
+
+# Built analysis frames keyed by (user_id, start_date, end_date). Cached frames
+# are shared between requests and must be treated as read-only.
+_frame_cache = TTLCache(
+    max_entries=settings.analysis_cache_max_entries,
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+)
+
+# Rank matrices per frame, keyed by id(df) and dropped when the frame is
+# garbage-collected. Kept off df.attrs because pandas deep-copies attrs into
+# every derived frame.
+_rank_cache: dict[int, dict[tuple[str, ...], np.ndarray]] = {}
+
+
+def invalidate_user_analysis_cache(user_id: str) -> None:
+    """Drop cached analysis frames for a user (call after ingest/feature runs)."""
+    _frame_cache.invalidate_user(user_id)
 
 
 async def load_analysis_data(
@@ -15,13 +37,24 @@ async def load_analysis_data(
     start_date: date | None = None,
     end_date: date | None = None,
 ) -> pd.DataFrame:
-    """Load daily and feature data for analysis, scoped to a user."""
+    """Load daily and feature data for analysis, scoped to a user.
+
+    Results are cached per (user, start, end) for a short TTL; callers must
+    not mutate the returned frame.
+    """
+    cache_key = (user_id, start_date, end_date)
+    cached = _frame_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     async with get_db_for_user(user_id) as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(row_factory=tuple_row) as cur:
+            # USING merges the join keys, so date/user_id come over once per
+            # row instead of once from each table.
             query = """
-                SELECT d.*, f.*
+                SELECT *
                 FROM oura_daily d
-                LEFT JOIN oura_features_daily f ON d.date = f.date AND d.user_id = f.user_id
+                LEFT JOIN oura_features_daily f USING (user_id, date)
                 WHERE d.user_id = %(uid)s
             """
             params: dict[str, Any] = {"uid": user_id}
@@ -37,16 +70,80 @@ async def load_analysis_data(
 
             await cur.execute(query, params)
             rows = await cur.fetchall()
+            columns = [c.name for c in cur.description]
 
     if not rows:
         return pd.DataFrame()
 
-    df = pd.DataFrame([dict(r) for r in rows])
-    if "date" in df.columns:
-        df = df.loc[:, ~df.columns.duplicated()]
+    # Build column-wise from tuples; oura_daily columns precede the feature
+    # columns, so keeping the first of each remaining duplicated name
+    # (updated_at) keeps the oura_daily value.
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    df = df.loc[:, ~df.columns.duplicated()]
+    _frame_cache.set(cache_key, df)
     return df
 
 
+def get_ranks(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    """Average ranks of `cols` over the rows where all of them are present.
+
+    Memoized per frame and column list, so endpoints sharing a cached frame
+    rank each column set once. Frames must not be mutated after ranking.
+    """
+    key = id(df)
+    per_frame = _rank_cache.get(key)
+    if per_frame is None:
+        per_frame = _rank_cache[key] = {}
+        weakref.finalize(df, _rank_cache.pop, key, None)
+
+    cols_key = tuple(cols)
+    ranks = per_frame.get(cols_key)
+    if ranks is None:
+        values = df[list(cols)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        values = values[~np.isnan(values).any(axis=1)]
+        ranks = stats.rankdata(values, axis=0)
+        per_frame[cols_key] = ranks
+    return ranks
+
+
+def _pearson_rows(a: np.ndarray, b: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Row-wise Pearson correlation of two NaN-padded matrices."""
+    counts = np.maximum(n, 1)[:, None]
+    a = np.nan_to_num(a - np.nansum(a, axis=1, keepdims=True) / counts)
+    b = np.nan_to_num(b - np.nansum(b, axis=1, keepdims=True) / counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (a * b).sum(axis=1) / np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+
+
+def _spearman_p_values(
+    rho: np.ndarray, n: np.ndarray, n_controls: int = 0
+) -> np.ndarray:
+    """Two-sided p-values for (partial) Spearman rho via the t-distribution.
+
+    Matches scipy's spearmanr for n_controls=0.
+    """
+    dof = np.asarray(n, dtype=float) - 2 - n_controls
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = rho * np.sqrt(dof / ((1.0 + rho) * (1.0 - rho)))
+    return 2 * stats.t.sf(np.abs(t), dof)
+
+
+def _paired_spearman(
+    xs: np.ndarray, ys: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Spearman rho, p-value and n for each row pair of two (k, n) matrices.
+
+    Each pair is ranked over its own complete cases (NaN marks a missing
+    value), and all k pairs are ranked in one rankdata call per side.
+    """
+    pair_valid = ~np.isnan(xs) & ~np.isnan(ys)
+    n_pairs = pair_valid.sum(axis=1)
+    rx = stats.rankdata(np.where(pair_valid, xs, np.nan), axis=1, nan_policy="omit")
+    ry = stats.rankdata(np.where(pair_valid, ys, np.nan), axis=1, nan_policy="omit")
+    rhos = _pearson_rows(rx, ry, n_pairs)
+    return rhos, _spearman_p_values(rhos, n_pairs), n_pairs
+
+
 def compute_spearman_correlations(
     df: pd.DataFrame,
     target: str,
@@ -56,29 +153,32 @@ def compute_spearman_correlations(
     if target not in df.columns:
         return []
 
-    results = []
-    target_series = df[target].dropna()
-
-    for candidate in candidates:
-        if candidate not in df.columns or candidate == target:
-            continue
-
-        candidate_series = df[candidate].dropna()
-        common_idx = target_series.index.intersection(candidate_series.index)
-        if len(common_idx) < 10:
-            continue
+    cols = list(dict.fromkeys(
+        c for c in candidates if c in df.columns and c != target
+    ))
+    if not cols:
+        return []
 
-        x = target_series.loc[common_idx]
-        y = candidate_series.loc[common_idx]
-        rho, p_value = stats.spearmanr(x, y)
+    # Target vs every candidate as stacked row pairs, ranked together in
+    # chunks so memory stays bounded for wide candidate lists.
+    target_values = pd.to_numeric(df[target], errors="coerce").to_numpy(dtype=float)
+    values = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float).T
+    chunk = max(1, 2**20 // max(len(target_values), 1))
 
-        if not np.isnan(rho):
-            results.append({
-                "metric": candidate,
-                "rho": float(rho),
-                "p_value": float(p_value),
-                "n": len(common_idx),
-            })
+    results = []
+    for lo in range(0, len(cols), chunk):
+        ys = values[lo:lo + chunk]
+        xs = np.broadcast_to(target_values, ys.shape)
+        rhos, p_values, n_pairs = _paired_spearman(xs, ys)
+
+        for candidate, r, p, n in zip(cols[lo:lo + chunk], rhos, p_values, n_pairs):
+            if n >= 10 and not np.isnan(r):
+                results.append({
+                    "metric": candidate,
+                    "rho": float(r),
+                    "p_value": float(p),
+                    "n": int(n),
+                })
 
     results.sort(key=lambda r: abs(r["rho"]), reverse=True)
     return results
@@ -98,35 +198,45 @@ def compute_lagged_correlations(
     best_rho = 0
     best_lag = 0
 
-    x = df[metric_x].dropna()
-    y = df[metric_y].dropna()
-
-    for lag in range(max_lag + 1):
-        if lag == 0:
-            x_lagged = x
-            y_aligned = y
-        else:
-            x_lagged = x.iloc[:-lag] if lag > 0 else x
-            y_aligned = y.iloc[lag:] if lag > 0 else y
-
-        common_idx = x_lagged.index.intersection(y_aligned.index)
-        if len(common_idx) < 10:
+    x = pd.to_numeric(df[metric_x], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(df[metric_y], errors="coerce").to_numpy(dtype=float)
+    if "date" in df.columns and len(df):
+        # Place rows on a contiguous daily grid so a lag of k rows is k days
+        # even when some days have no data.
+        days = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[D]")
+        offsets = (days - days.min()).astype(np.int64)
+        span = int(offsets.max()) + 1
+        x_grid = np.full(span, np.nan)
+        y_grid = np.full(span, np.nan)
+        x_grid[offsets] = x
+        y_grid[offsets] = y
+        x, y = x_grid, y_grid
+
+    # Lags leaving fewer than 10 pairs are skipped below, so they are never
+    # built; this also bounds the matrices below at len(y) rows.
+    n_lags = max(0, min(max_lag + 1, len(y) - 9))
+
+    # Row `lag` pairs x[t] with y[t + lag]; all lags are stacked into one
+    # matrix and ranked in a single pass.
+    y_padded = np.concatenate([y, np.full(n_lags, np.nan)])
+    ys = sliding_window_view(y_padded, len(y))[:n_lags]
+    xs = np.broadcast_to(x, ys.shape)
+    rhos, p_values, n_pairs = _paired_spearman(xs, ys)
+
+    for lag in range(n_lags):
+        rho = rhos[lag]
+        if n_pairs[lag] < 10 or np.isnan(rho):
             continue
 
-        x_vals = x_lagged.loc[common_idx]
-        y_vals = y_aligned.loc[common_idx]
-        rho, p_value = stats.spearmanr(x_vals, y_vals)
-
-        if not np.isnan(rho):
-            results.append({
-                "lag": lag,
-                "rho": float(rho),
-                "p_value": float(p_value),
-                "n": len(common_idx),
-            })
-            if abs(rho) > abs(best_rho):
-                best_rho = rho
-                best_lag = lag
+        results.append({
+            "lag": lag,
+            "rho": float(rho),
+            "p_value": float(p_values[lag]),
+            "n": int(n_pairs[lag]),
+        })
+        if abs(rho) > abs(best_rho):
+            best_rho = rho
+            best_lag = lag
 
     return {
         "metric_x": metric_x,
@@ -151,31 +261,44 @@ def compute_controlled_correlation(
             "rho": 0, "p_value": 1, "n": 0, "controlled_for": control_vars,
         }
 
-    clean_df = df[required_cols].dropna()
-    if len(clean_df) < 10:
+    # A control equal to either metric (or x == y) makes the rank
+    # correlation matrix singular; there is nothing meaningful to report.
+    if metric_x == metric_y or {metric_x, metric_y} & set(control_vars):
         return {
             "metric_x": metric_x, "metric_y": metric_y,
-            "rho": 0, "p_value": 1, "n": len(clean_df), "controlled_for": control_vars,
+            "rho": 0, "p_value": 1, "n": 0, "controlled_for": control_vars,
         }
 
-    from sklearn.linear_model import LinearRegression
-
-    X_controls = clean_df[control_vars].values.astype(float)
-    x = clean_df[metric_x].values.astype(float)
-    y = clean_df[metric_y].values.astype(float)
+    ranks = get_ranks(df, list(dict.fromkeys(required_cols)))
+    n = len(ranks)
+    if n < 10:
+        return {
+            "metric_x": metric_x, "metric_y": metric_y,
+            "rho": 0, "p_value": 1, "n": n, "controlled_for": control_vars,
+        }
 
-    reg_x = LinearRegression().fit(X_controls, x)
-    residuals_x = x - reg_x.predict(X_controls)
-    reg_y = LinearRegression().fit(X_controls, y)
-    residuals_y = y - reg_y.predict(X_controls)
-    rho, p_value = stats.spearmanr(residuals_x, residuals_y)
+    # Partial Spearman from the inverse of the rank correlation matrix:
+    # rho_xy.z = -P[0, 1] / sqrt(P[0, 0] * P[1, 1]). Constant controls carry
+    # no information and are dropped; any remaining collinearity leaves the
+    # matrix singular and falls back to the defaults below.
+    varying = np.ptp(ranks, axis=0) > 0
+    keep = [0, 1] + [i for i in range(2, ranks.shape[1]) if varying[i]]
+    rho = p_value = np.nan
+    corr = np.corrcoef(ranks[:, keep], rowvar=False) if varying[0] and varying[1] else None
+    if corr is not None and np.linalg.matrix_rank(corr) == len(keep):
+        precision = np.linalg.inv(corr)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rho = float(np.clip(
+                -precision[0, 1] / np.sqrt(precision[0, 0] * precision[1, 1]), -1.0, 1.0
+            ))
+        p_value = float(_spearman_p_values(rho, n, n_controls=len(keep) - 2))
 
     return {
         "metric_x": metric_x,
         "metric_y": metric_y,
-        "rho": float(rho) if not np.isnan(rho) else 0,
-        "p_value": float(p_value) if not np.isnan(p_value) else 1,
-        "n": len(clean_df),
+        "rho": rho if not np.isnan(rho) else 0,
+        "p_value": p_value if not np.isnan(p_value) else 1,
+        "n": n,
         "controlled_for": control_vars,
     }
 
@@ -187,36 +310,37 @@ def compute_correlation_matrix(
     """Compute pairwise Spearman correlation matrix."""
     available = [m for m in metrics if m in df.columns]
     n = len(available)
-    matrix = [[0.0] * n for _ in range(n)]
-    p_values = [[0.0] * n for _ in range(n)]
-    n_matrix = [[0] * n for _ in range(n)]
-
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                matrix[i][j] = 1.0
-                p_values[i][j] = 0.0
-                n_matrix[i][j] = int(df[available[i]].dropna().shape[0])
-            elif j > i:
-                x = df[available[i]]
-                y = df[available[j]]
-                mask = x.notna() & y.notna()
-                n_obs = int(mask.sum())
-                if n_obs >= 10:
-                    rho, p = stats.spearmanr(x[mask], y[mask])
-                    if not np.isnan(rho):
-                        matrix[i][j] = float(rho)
-                        matrix[j][i] = float(rho)
-                        p_values[i][j] = float(p)
-                        p_values[j][i] = float(p)
-                n_matrix[i][j] = n_obs
-                n_matrix[j][i] = n_obs
+    if n == 0:
+        return {"metrics": [], "matrix": [], "p_values": [], "n_matrix": []}
+
+    values = df[available].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    # Pairwise complete-case counts for every pair in one matmul.
+    n_matrix = valid.T.astype(float) @ valid.astype(float)
+
+    matrix = np.eye(n)
+    p_values = np.zeros((n, n))
+
+    rows, cols = np.triu_indices(n, 1)
+    keep = n_matrix[rows, cols] >= 10
+    rows, cols = rows[keep], cols[keep]
+
+    # Rank all pairs as stacked rows (each masked to its complete cases),
+    # in chunks so memory stays bounded for wide metric lists.
+    chunk = max(1, 2**20 // max(len(values), 1))
+    for lo in range(0, len(rows), chunk):
+        i, j = rows[lo:lo + chunk], cols[lo:lo + chunk]
+        rhos, p, _ = _paired_spearman(values[:, i].T, values[:, j].T)
+        ok = ~np.isnan(rhos)
+        i, j = i[ok], j[ok]
+        matrix[i, j] = matrix[j, i] = rhos[ok]
+        p_values[i, j] = p_values[j, i] = p[ok]
 
     return {
         "metrics": available,
-        "matrix": matrix,
-        "p_values": p_values,
-        "n_matrix": n_matrix,
+        "matrix": matrix.tolist(),
+        "p_values": p_values.tolist(),
+        "n_matrix": n_matrix.astype(int).tolist(),
     }
 
 
@@ -6,11 +6,26 @@ from typing import Any
 import numpy as np
 import pandas as pd
 import ruptures as rpt
+from psycopg.rows import tuple_row
 from scipy import stats
 from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing import scale
 
+from app.analysis.cache import TTLCache
 from app.db import get_db_for_user
+from app.settings import settings
+
+# Weekly cluster results keyed by (user_id, features, n_clusters, start, end).
+# Cached results are shared between requests and must be treated as read-only.
+_cluster_cache = TTLCache(
+    max_entries=settings.analysis_cache_max_entries,
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+)
+
+
+def invalidate_user_pattern_cache(user_id: str) -> None:
+    """Drop cached pattern results for a user (call after ingest/feature runs)."""
+    _cluster_cache.invalidate_user(user_id)
 
 
 async def load_metric_series(
@@ -21,7 +36,7 @@ async def load_metric_series(
 ) -> pd.Series:
     """Load a single metric as a time series for a user."""
     async with get_db_for_user(user_id) as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(row_factory=tuple_row) as cur:
             query = f"""
                 SELECT date, {metric}
                 FROM oura_daily
@@ -45,7 +60,7 @@ async def load_metric_series(
     if not rows:
         return pd.Series(dtype=float)
 
-    df = pd.DataFrame([dict(r) for r in rows])
+    df = pd.DataFrame.from_records(rows, columns=["date", metric])
     df["date"] = pd.to_datetime(df["date"])
     return df.set_index("date")[metric]
 
@@ -58,15 +73,29 @@ def detect_change_points(
     if len(series) < 10:
         return []
 
-    series_clean = pd.Series(series).interpolate().bfill().ffill().values
+    series = np.asarray(series, dtype=float)
+    missing = np.isnan(series)
+    if missing.all():
+        return []
+
+    # Linear interpolation over gaps; np.interp holds the edge values
+    # constant, matching the previous interpolate().bfill().ffill().
+    series_clean = series.copy()
+    if missing.any():
+        positions = np.arange(len(series))
+        series_clean[missing] = np.interp(
+            positions[missing], positions[~missing], series[~missing]
+        )
 
     try:
-        algo = rpt.Pelt(model="rbf", min_size=5).fit(series_clean)
+        # KernelCPD searches every index (like Pelt with jump=1); the old
+        # rpt.Pelt default jump=5 only placed breakpoints on multiples of 5.
+        algo = rpt.KernelCPD(kernel="rbf", min_size=5).fit(series_clean)
         change_indices = algo.predict(pen=penalty)
     except Exception:
         return []
 
-    change_indices = [i for i in change_indices if i < len(series)]
+    change_indices = [int(i) for i in change_indices if i < len(series)]
 
     results = []
     prev_idx = 0
@@ -75,8 +104,8 @@ def detect_change_points(
         if idx == len(series):
             continue
 
-        before_mean = float(np.nanmean(series_clean[prev_idx:idx]))
-        after_mean = float(np.nanmean(series_clean[idx:]))
+        before_mean = float(np.mean(series_clean[prev_idx:idx]))
+        after_mean = float(np.mean(series_clean[idx:]))
         magnitude = abs(after_mean - before_mean)
         direction = "increase" if after_mean > before_mean else "decrease"
 
@@ -93,6 +122,15 @@ def detect_change_points(
     return results
 
 
+def _robust_z_scores(series: np.ndarray, valid_series: np.ndarray) -> np.ndarray:
+    """MAD-based z-scores for `series` using the median/MAD of `valid_series`."""
+    median = np.median(valid_series)
+    mad = np.median(np.abs(valid_series - median))
+    if mad < 1e-10:
+        mad = np.std(valid_series)
+    return 0.6745 * (series - median) / (mad + 1e-10)
+
+
 def detect_anomalies(
     series: np.ndarray,
     threshold: float = 3.0,
@@ -111,11 +149,7 @@ def detect_anomalies(
     valid_series = series[valid_mask]
 
     if use_mad:
-        median = np.median(valid_series)
-        mad = np.median(np.abs(valid_series - median))
-        if mad < 1e-10:
-            mad = np.std(valid_series)
-        z_scores = 0.6745 * (series - median) / (mad + 1e-10)
+        z_scores = _robust_z_scores(series, valid_series)
     else:
         mean = np.mean(valid_series)
         std = np.std(valid_series)
@@ -126,16 +160,19 @@ def detect_anomalies(
     anomaly_mask = np.abs(z_scores) > threshold
     anomaly_indices = np.where(anomaly_mask & valid_mask)[0]
 
-    results = []
-    for idx in anomaly_indices:
-        results.append({
-            "index": int(idx),
-            "value": float(series[idx]),
-            "z_score": float(z_scores[idx]),
-            "direction": "high" if z_scores[idx] > 0 else "low",
-        })
+    anomaly_z = z_scores[anomaly_indices]
+    directions = np.where(anomaly_z > 0, "high", "low")
 
-    return results
+    # tolist() converts each column to Python scalars in one C-level pass.
+    return [
+        {"index": idx, "value": value, "z_score": z, "direction": direction}
+        for idx, value, z, direction in zip(
+            anomaly_indices.tolist(),
+            series[anomaly_indices].tolist(),
+            anomaly_z.tolist(),
+            directions.tolist(),
+        )
+    ]
 
 
 async def load_weekly_data(
@@ -145,16 +182,22 @@ async def load_weekly_data(
     end_date: date | None = None,
 ) -> pd.DataFrame:
     """Load and aggregate data to weekly level for a user."""
-    safe_features = [f for f in features if f.isidentifier()]
+    safe_features = list(dict.fromkeys(f for f in features if f.isidentifier()))
     if not safe_features:
         return pd.DataFrame()
 
-    feature_cols = ", ".join(safe_features)
+    feature_avgs = ", ".join(
+        f"AVG({f})::double precision AS {f}" for f in safe_features
+    )
 
     async with get_db_for_user(user_id) as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(row_factory=tuple_row) as cur:
+            # ISO year/week (Monday-based), matching pandas' isocalendar() grouping.
             query = f"""
-                SELECT date, {feature_cols}
+                SELECT
+                    EXTRACT(ISOYEAR FROM date)::int AS year,
+                    EXTRACT(WEEK FROM date)::int AS week,
+                    {feature_avgs}
                 FROM oura_daily
                 WHERE user_id = %(uid)s
             """
@@ -167,7 +210,7 @@ async def load_weekly_data(
                 query += " AND date <= %(end)s"
                 params["end"] = end_date
 
-            query += " ORDER BY date ASC"
+            query += " GROUP BY 1, 2 ORDER BY 1, 2"
 
             await cur.execute(query, params)
             rows = await cur.fetchall()
@@ -175,13 +218,7 @@ async def load_weekly_data(
     if not rows:
         return pd.DataFrame()
 
-    df = pd.DataFrame([dict(r) for r in rows])
-    df["date"] = pd.to_datetime(df["date"])
-    df["year"] = df["date"].dt.isocalendar().year
-    df["week"] = df["date"].dt.isocalendar().week
-    weekly = df.groupby(["year", "week"])[safe_features].mean().reset_index()
-
-    return weekly
+    return pd.DataFrame.from_records(rows, columns=["year", "week", *safe_features])
 
 
 def cluster_weeks(
@@ -201,28 +238,36 @@ def cluster_weeks(
     if len(clean_df) < n_clusters:
         return {"weeks": [], "cluster_profiles": {}}
 
-    scaler = StandardScaler()
-    X = scaler.fit_transform(clean_df[available_features])
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    # Standardize in place on a private float64 copy (raw step counts are too
+    # large for float32 centering), then hand k-means float32, which is
+    # plenty for z-scored weekly averages.
+    X = scale(clean_df[available_features].to_numpy(dtype=float, copy=True), copy=False)
+    X = X.astype(np.float32)
+    # A single k-means++ run (sklearn's n_init="auto") is enough for a few
+    # hundred weeks; ten restarts mostly re-found the same partition.
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=1)
     labels = kmeans.fit_predict(X)
 
-    clean_df = clean_df.copy()
-    clean_df["cluster"] = labels
-
-    weeks = []
-    for _, row in clean_df.iterrows():
-        weeks.append({
-            "year": int(row["year"]),
-            "week": int(row["week"]),
-            "cluster": int(row["cluster"]),
-            "label": None,
-        })
-
-    cluster_profiles = {}
-    for cluster_id in range(n_clusters):
-        cluster_data = clean_df[clean_df["cluster"] == cluster_id][available_features]
-        profile = cluster_data.mean().to_dict()
-        cluster_profiles[str(cluster_id)] = {k: float(v) for k, v in profile.items()}
+    weeks = [
+        {"year": year, "week": week, "cluster": cluster, "label": None}
+        for year, week, cluster in zip(
+            clean_df["year"].astype(int).tolist(),
+            clean_df["week"].astype(int).tolist(),
+            labels.tolist(),
+        )
+    ]
+
+    profiles = (
+        clean_df[available_features]
+        .groupby(labels)
+        .mean()
+        .reindex(range(n_clusters))
+        .astype(float)
+    )
+    cluster_profiles = {
+        str(cluster_id): profile
+        for cluster_id, profile in profiles.to_dict(orient="index").items()
+    }
 
     return {"weeks": weeks, "cluster_profiles": cluster_profiles}
 
@@ -261,10 +306,10 @@ async def get_anomalies(
         return {"metric": metric, "anomalies": []}
 
     anomalies = detect_anomalies(series.values, threshold)
-    dates = series.index.tolist()
+    dates = series.index.strftime("%Y-%m-%d")
     for anomaly in anomalies:
         if anomaly["index"] < len(dates):
-            anomaly["date"] = dates[anomaly["index"]].strftime("%Y-%m-%d")
+            anomaly["date"] = dates[anomaly["index"]]
 
     return {"metric": metric, "anomalies": anomalies}
 
@@ -276,7 +321,15 @@ async def get_weekly_clusters(
     end_date: date | None = None,
     user_id: str = "",
 ) -> dict[str, Any]:
+    cache_key = (user_id, tuple(features), n_clusters, start_date, end_date)
+    cached = _cluster_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     weekly_df = await load_weekly_data(features, user_id, start_date, end_date)
     if weekly_df.empty:
-        return {"weeks": [], "cluster_profiles": {}}
-    return cluster_weeks(weekly_df, features, n_clusters)
+        result = {"weeks": [], "cluster_profiles": {}}
+    else:
+        result = cluster_weeks(weekly_df, features, n_clusters)
+    _cluster_cache.set(cache_key, result)
+    return result
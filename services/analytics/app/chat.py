@@ -1951,13 +1951,13 @@ async def _tool_get_chronotype(user_id: str) -> str:
             await cur.execute("""
                 SELECT
                     r.day as date,
-                    r.payload->>'bedtime_start' as bedtime_start,
-                    r.payload->>'bedtime_end' as bedtime_end,
+                    r.bedtime_start,
+                    r.bedtime_end,
                     d.is_weekend
                 FROM oura_raw r
                 JOIN oura_daily d ON r.day = d.date AND r.user_id = d.user_id
                 WHERE r.source = 'sleep'
-                AND r.payload->>'type' = 'long_sleep'
+                AND r.sleep_type = 'long_sleep'
                 AND r.user_id = %s
                 ORDER BY r.day DESC
                 LIMIT 90
@@ -1973,8 +1973,8 @@ async def _tool_get_chronotype(user_id: str) -> str:
     for r in rows:
         if r["bedtime_start"] and r["bedtime_end"]:
             try:
-                start = datetime.fromisoformat(r["bedtime_start"].replace("Z", "+00:00"))
-                end = datetime.fromisoformat(r["bedtime_end"].replace("Z", "+00:00"))
+                start = datetime.fromisoformat(r["bedtime_start"])
+                end = datetime.fromisoformat(r["bedtime_end"])
                 midpoint = start + (end - start) / 2
                 hours = midpoint.hour + midpoint.minute / 60
                 if hours < 6:
@@ -16,12 +16,13 @@ _pool_lock = asyncio.Lock()
 def _build_pool() -> AsyncConnectionPool:
     return AsyncConnectionPool(
         conninfo=settings.database_url,
-        min_size=1,
-        max_size=10,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
         timeout=30,
         kwargs={
             "row_factory": dict_row,
             "autocommit": False,
+            "prepare_threshold": settings.db_prepare_threshold,
         },
         open=False,
     )
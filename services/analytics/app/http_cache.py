@@ -0,0 +1,97 @@
+"""Conditional GET support (ETag / If-None-Match) for read-only endpoints."""
+
+import functools
+import hashlib
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+
+from app.analysis.cache import TTLCache
+from app.db import get_db_for_user
+from app.settings import settings
+
+# Rendered response models keyed by (user_id, etag). The ETag already encodes
+# the route, query string and data version, so a hit is always current.
+_response_cache = TTLCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+)
+
+
+async def get_data_version(user_id: str) -> str:
+    """Cheap fingerprint of everything the read endpoints derive from.
+
+    Row counts catch deletes, MAX(updated_at) catches inserts and re-ingested
+    days (the updated_at triggers bump it), and CURRENT_DATE rolls the
+    "last N days" windows over at midnight.
+    """
+    async with get_db_for_user(user_id) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("""
+                SELECT
+                    CURRENT_DATE AS today,
+                    (SELECT COUNT(*) FROM oura_daily WHERE user_id = %(user_id)s) AS daily_rows,
+                    (SELECT MAX(updated_at) FROM oura_daily WHERE user_id = %(user_id)s) AS daily_updated,
+                    (SELECT COUNT(*) FROM oura_features_daily WHERE user_id = %(user_id)s) AS feature_rows,
+                    (SELECT MAX(updated_at) FROM oura_features_daily WHERE user_id = %(user_id)s) AS features_updated,
+                    (SELECT updated_at FROM oura_auth WHERE user_id = %(user_id)s) AS auth_updated
+            """, {"user_id": user_id})
+            row = await cur.fetchone()
+
+    return "|".join(str(value) for value in row.values())
+
+
+def compute_etag(request: Request, user_id: str, version: str) -> str:
+    """Weak ETag over the user, route, query string and data version."""
+    params = sorted(request.query_params.multi_items())
+    key = f"{user_id}|{request.url.path}|{params}|{version}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def conditional_get(
+    endpoint: Callable[..., Awaitable[Any]],
+) -> Callable[..., Awaitable[Any]]:
+    """Wrap a per-user GET endpoint with ETag revalidation and response caching.
+
+    The endpoint must take `request`, `response` and `user` parameters. A
+    matching If-None-Match gets an empty 304; otherwise a cached rendering for
+    the same ETag is reused (unless the client sent Cache-Control: no-cache or
+    no-store), and only on a miss does the endpoint run.
+    """
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        request: Request = kwargs["request"]
+        response: Response = kwargs["response"]
+        user_id = kwargs["user"]["user_id"]
+
+        etag = compute_etag(request, user_id, await get_data_version(user_id))
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+        cache_control = request.headers.get("cache-control", "")
+        use_cache = "no-store" not in cache_control and "no-cache" not in cache_control
+        if use_cache:
+            cached = _response_cache.get((user_id, etag))
+            if cached is not None:
+                return cached
+
+        result = await endpoint(*args, **kwargs)
+        if not isinstance(result, Response):
+            _response_cache.set((user_id, etag), result)
+        return result
+
+    return wrapper
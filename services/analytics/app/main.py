@@ -6,9 +6,12 @@ import logging
 from contextlib import asynccontextmanager, suppress
 from datetime import date, datetime
 from pathlib import Path
+from types import MappingProxyType
 
-from fastapi import Depends, FastAPI, HTTPException, Query, Request
+import numpy as np
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse
 
 logger = logging.getLogger(__name__)
@@ -24,9 +27,11 @@ from app.auth import (
     validate_password,
 )
 from app.chat import initialize_system_prompt
-from app.db import close_db_pool, get_db_for_user, get_db_system
+from app.db import close_db_pool, get_db_for_user, get_db_system, init_db_pool
 from app.dependencies import get_current_user
+from app.http_cache import conditional_get
 from app.oura import auth as oura_auth
+from app.oura.client import oura_client
 from app.pipelines import features, ingest
 from app.settings import settings
 from app.schemas import (
@@ -135,6 +140,9 @@ async def lifespan(app: FastAPI):
         raise RuntimeError(f"TOKEN_ENCRYPTION_KEY is not a valid Fernet key: {e}") from e
 
     initialize_system_prompt()
+    # Open the shared pool at startup even when auto-migrate is off; min_size
+    # connections are filled in the background (open(wait=False)).
+    await init_db_pool()
     await run_migrations()
 
     # Runtime DB-role guard
@@ -159,6 +167,8 @@ async def lifespan(app: FastAPI):
         cleanup_task.cancel()
         with suppress(asyncio.CancelledError):
             await cleanup_task
+        await oura_client.aclose()
+        await oura_auth.close_http_client()
         await close_db_pool()
 
 
@@ -183,6 +193,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON bodies. NDJSON streams opt out by sending
+# Content-Encoding: identity, so each line reaches the client as it is produced.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
@@ -284,7 +298,10 @@ async def get_me(user: dict = Depends(get_current_user)):
 
 
 @app.get("/dashboard", response_model=DashboardResponse)
+@conditional_get
 async def get_dashboard(
+    request: Request,
+    response: Response,
     days: int = Query(default=7, description="Number of days for averages and trends"),
     user: dict = Depends(get_current_user),
 ) -> DashboardResponse:
@@ -294,13 +311,68 @@ async def get_dashboard(
 
     user_id = user["user_id"]
 
-    # Check auth status
+    date_filter = "AND date >= CURRENT_DATE - %(days)s" if days > 0 else ""
+    params = {"days": days, "user_id": user_id}
+
+    # Auth check, averages and trend rows go out in one pipelined round trip.
     async with get_db_for_user(user_id) as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "SELECT user_id FROM oura_auth WHERE user_id = %s", (user_id,)
-            )
-            auth_row = await cur.fetchone()
+        async with (
+            conn.cursor() as auth_cur,
+            conn.cursor() as summary_cur,
+            conn.cursor() as trend_cur,
+        ):
+            async with conn.pipeline():
+                await auth_cur.execute(
+                    "SELECT user_id FROM oura_auth WHERE user_id = %(user_id)s", params
+                )
+                # Averages for the selected period
+                await summary_cur.execute(f"""
+                    SELECT
+                        AVG(readiness_score) as readiness_avg,
+                        AVG(sleep_score) as sleep_score_avg,
+                        AVG(activity_score) as activity_avg,
+                        AVG(steps) as steps_avg,
+                        AVG(hrv_average) as hrv_avg,
+                        AVG(hr_lowest) as rhr_avg,
+                        AVG(sleep_total_hours) as sleep_hours_avg,
+                        AVG(cal_total) as calories_avg,
+                        AVG(stress_high_minutes) as stress_avg,
+                        AVG(recovery_high_minutes) as recovery_avg,
+                        AVG(spo2_average) as spo2_avg,
+                        AVG(workout_total_minutes) as workout_minutes_avg,
+                        COUNT(*) as days_with_data
+                    FROM oura_daily
+                    WHERE user_id = %(user_id)s
+                    {date_filter}
+                    AND (readiness_score IS NOT NULL
+                         OR sleep_score IS NOT NULL
+                         OR activity_score IS NOT NULL
+                         OR steps IS NOT NULL)
+                """, params)
+                # Trend data for the selected period
+                await trend_cur.execute(f"""
+                    SELECT
+                        date,
+                        readiness_score,
+                        sleep_score,
+                        activity_score,
+                        steps,
+                        hrv_average,
+                        hr_lowest as rhr,
+                        sleep_total_hours as sleep_hours,
+                        stress_high_minutes,
+                        recovery_high_minutes,
+                        spo2_average,
+                        workout_total_minutes
+                    FROM oura_daily
+                    WHERE user_id = %(user_id)s
+                    {date_filter}
+                    ORDER BY date
+                """, params)
+
+            auth_row = await auth_cur.fetchone()
+            summary_row = await summary_cur.fetchone()
+            trend_rows = await trend_cur.fetchall()
 
     if not auth_row:
         return DashboardResponse(
@@ -309,57 +381,6 @@ async def get_dashboard(
             trends=[],
         )
 
-    async with get_db_for_user(user_id) as conn:
-        async with conn.cursor() as cur:
-            # Get averages for the selected period
-            date_filter = "AND date >= CURRENT_DATE - %(days)s" if days > 0 else ""
-            await cur.execute(f"""
-                SELECT
-                    AVG(readiness_score) as readiness_avg,
-                    AVG(sleep_score) as sleep_score_avg,
-                    AVG(activity_score) as activity_avg,
-                    AVG(steps) as steps_avg,
-                    AVG(hrv_average) as hrv_avg,
-                    AVG(hr_lowest) as rhr_avg,
-                    AVG(sleep_total_seconds / 3600.0) as sleep_hours_avg,
-                    AVG(cal_total) as calories_avg,
-                    AVG(stress_high_minutes) as stress_avg,
-                    AVG(recovery_high_minutes) as recovery_avg,
-                    AVG(spo2_average) as spo2_avg,
-                    AVG(workout_total_minutes) as workout_minutes_avg,
-                    COUNT(*) as days_with_data
-                FROM oura_daily
-                WHERE user_id = %(user_id)s
-                {date_filter}
-                AND (readiness_score IS NOT NULL
-                     OR sleep_score IS NOT NULL
-                     OR activity_score IS NOT NULL
-                     OR steps IS NOT NULL)
-            """, {"days": days, "user_id": user_id})
-            summary_row = await cur.fetchone()
-
-            # Get trend data for the selected period
-            await cur.execute(f"""
-                SELECT
-                    date,
-                    readiness_score,
-                    sleep_score,
-                    activity_score,
-                    steps,
-                    hrv_average,
-                    hr_lowest as rhr,
-                    sleep_total_seconds / 3600.0 as sleep_hours,
-                    stress_high_minutes,
-                    recovery_high_minutes,
-                    spo2_average,
-                    workout_total_minutes
-                FROM oura_daily
-                WHERE user_id = %(user_id)s
-                {date_filter}
-                ORDER BY date
-            """, {"days": days, "user_id": user_id})
-            trend_rows = await cur.fetchall()
-
     summary = DashboardSummary(
         readiness_avg=round(summary_row["readiness_avg"], 1) if summary_row["readiness_avg"] else None,
         sleep_score_avg=round(summary_row["sleep_score_avg"], 1) if summary_row["sleep_score_avg"] else None,
@@ -376,14 +397,16 @@ async def get_dashboard(
         days_with_data=summary_row["days_with_data"] or 0,
     )
 
-    # Build trend series for each metric
+    # Build trend series for each metric; the date column is shared by all
+    # series, and values come typed from the DB so validation is skipped.
+    trend_dates = [row["date"] for row in trend_rows]
+
     def build_trend(metric_key: str) -> list[TrendPoint]:
         return [
-            TrendPoint(
-                date=str(row["date"]),
-                value=float(row[metric_key]) if row[metric_key] is not None else None,
+            TrendPoint.model_construct(
+                date=day, value=float(value) if value is not None else None
             )
-            for row in trend_rows
+            for day, value in zip(trend_dates, [row[metric_key] for row in trend_rows])
         ]
 
     trends = [
@@ -486,6 +509,8 @@ async def admin_ingest(
         result = await ingest.run_full_ingest(start, end, user["user_id"])
         from app.chat import invalidate_user_chat_cache
         await invalidate_user_chat_cache(user["user_id"])
+        correlations.invalidate_user_analysis_cache(user["user_id"])
+        patterns.invalidate_user_pattern_cache(user["user_id"])
 
         if result["days_processed"] == 0:
             if result.get("sync_mode") == "incremental":
@@ -529,11 +554,13 @@ async def admin_ingest_stream(
                 yield json.dumps(event) + "\n"
         finally:
             await invalidate_user_chat_cache(user["user_id"])
+            correlations.invalidate_user_analysis_cache(user["user_id"])
+            patterns.invalidate_user_pattern_cache(user["user_id"])
 
     return StreamingResponse(
         stream(),
         media_type="application/x-ndjson",
-        headers={"Cache-Control": "no-cache"},
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"},
     )
 
 
@@ -546,6 +573,8 @@ async def admin_features(
     """Compute derived features for a date range."""
     try:
         days_processed = await features.recompute_features(start, end, user["user_id"])
+        correlations.invalidate_user_analysis_cache(user["user_id"])
+        patterns.invalidate_user_pattern_cache(user["user_id"])
         return SyncResponse(
             status="completed",
             days_processed=days_processed,
@@ -559,6 +588,8 @@ async def admin_features(
 # Correlation Endpoints
 # ============================================
 
+# The analysis functions already return dicts shaped like the response models,
+# so handlers return them as-is and response_model validates them once.
 
 @app.post("/analyze/correlations/spearman", response_model=SpearmanResponse)
 async def analyze_spearman(
@@ -572,18 +603,7 @@ async def analyze_spearman(
     result = await correlations.get_spearman_correlations(
         target, candidates, start, end, user["user_id"]
     )
-    return SpearmanResponse(
-        target=result["target"],
-        correlations=[
-            {
-                "metric": c["metric"],
-                "rho": c["rho"],
-                "p_value": c["p_value"],
-                "n": c["n"],
-            }
-            for c in result["correlations"]
-        ],
-    )
+    return result
 
 
 @app.post("/analyze/correlations/matrix", response_model=CorrelationMatrixResponse)
@@ -613,15 +633,7 @@ async def analyze_scatter_data(
 ):
     """Get scatter plot data for two metrics."""
     result = await correlations.get_scatter_data(metric_x, metric_y, start, end, user["user_id"])
-    return ScatterDataResponse(
-        metric_x=result["metric_x"],
-        metric_y=result["metric_y"],
-        points=[
-            {"x": p["x"], "y": p["y"], "date": p["date"]}
-            for p in result["points"]
-        ],
-        n=result["n"],
-    )
+    return result
 
 
 @app.post("/analyze/correlations/lagged", response_model=LaggedCorrelationResponse)
@@ -637,20 +649,7 @@ async def analyze_lagged(
     result = await correlations.get_lagged_correlations(
         metric_x, metric_y, max_lag, start, end, user["user_id"]
     )
-    return LaggedCorrelationResponse(
-        metric_x=result["metric_x"],
-        metric_y=result["metric_y"],
-        lags=[
-            {
-                "lag": l["lag"],
-                "rho": l["rho"],
-                "p_value": l["p_value"],
-                "n": l["n"],
-            }
-            for l in result["lags"]
-        ],
-        best_lag=result["best_lag"],
-    )
+    return result
 
 
 @app.post("/analyze/correlations/controlled", response_model=ControlledCorrelationResponse)
@@ -691,20 +690,7 @@ async def analyze_change_points(
 ):
     """Detect change points in a metric time series."""
     result = await patterns.get_change_points(metric, start, end, penalty, user["user_id"])
-    return ChangePointResponse(
-        metric=result["metric"],
-        change_points=[
-            {
-                "date": cp.get("date", ""),
-                "index": cp["index"],
-                "before_mean": cp["before_mean"],
-                "after_mean": cp["after_mean"],
-                "magnitude": cp["magnitude"],
-                "direction": cp["direction"],
-            }
-            for cp in result["change_points"]
-        ],
-    )
+    return result
 
 
 @app.post("/analyze/patterns/anomalies", response_model=AnomalyResponse)
@@ -717,18 +703,7 @@ async def analyze_anomalies(
 ):
     """Detect anomalies in a metric time series."""
     result = await patterns.get_anomalies(metric, start, end, threshold, user["user_id"])
-    return AnomalyResponse(
-        metric=result["metric"],
-        anomalies=[
-            {
-                "date": a.get("date", ""),
-                "value": a["value"],
-                "z_score": a["z_score"],
-                "direction": a["direction"],
-            }
-            for a in result["anomalies"]
-        ],
-    )
+    return result
 
 
 @app.post("/analyze/patterns/weekly-clusters", response_model=WeeklyClusterResponse)
@@ -743,27 +718,44 @@ async def analyze_weekly_clusters(
     result = await patterns.get_weekly_clusters(
         features_list, n_clusters, start, end, user["user_id"]
     )
-    return WeeklyClusterResponse(
-        weeks=[
-            {
-                "year": w["year"],
-                "week": w["week"],
-                "cluster": w["cluster"],
-                "label": w.get("label"),
-            }
-            for w in result["weeks"]
-        ],
-        cluster_profiles=result["cluster_profiles"],
-    )
+    return result
 
 
 # ============================================
 # Insights Endpoints
 # ============================================
 
+# Heatmap metric names -> SQL column expressions. This whitelist is the only
+# source of identifiers interpolated into the heatmap query.
+HEATMAP_METRIC_MAP = MappingProxyType({
+    "readiness_score": "readiness_score",
+    "sleep_score": "sleep_score",
+    "activity_score": "activity_score",
+    "steps": "steps",
+    "hrv_average": "hrv_average",
+    "hr_lowest": "hr_lowest",
+    "sleep_total_seconds": "sleep_total_hours",
+    "sleep_efficiency": "sleep_efficiency",
+    "sleep_deep_seconds": "sleep_deep_hours",
+    "sleep_rem_seconds": "sleep_rem_hours",
+    "cal_total": "cal_total",
+    "cal_active": "cal_active",
+    "stress_high_minutes": "stress_high_minutes",
+    "recovery_high_minutes": "recovery_high_minutes",
+    "spo2_average": "spo2_average",
+    "vascular_age": "vascular_age",
+    "workout_total_minutes": "workout_total_minutes",
+    "workout_count": "workout_count",
+    "sleep_breath_average": "sleep_breath_average",
+})
+HEATMAP_METRICS = frozenset(HEATMAP_METRIC_MAP)
+
 
 @app.get("/insights/heatmap", response_model=HeatmapResponse)
+@conditional_get
 async def get_heatmap(
+    request: Request,
+    response: Response,
     metric: str = Query(..., description="Metric to display"),
     days: int = Query(365, description="Number of days to show"),
     user: dict = Depends(get_current_user),
@@ -771,62 +763,44 @@ async def get_heatmap(
     """Get annual heatmap data for a metric."""
     user_id = user["user_id"]
 
-    # Map friendly metric names to actual SQL column expressions
-    metric_map = {
-        "readiness_score": "readiness_score",
-        "sleep_score": "sleep_score",
-        "activity_score": "activity_score",
-        "steps": "steps",
-        "hrv_average": "hrv_average",
-        "hr_lowest": "hr_lowest",
-        "sleep_total_seconds": "sleep_total_seconds / 3600.0",
-        "sleep_efficiency": "sleep_efficiency",
-        "sleep_deep_seconds": "sleep_deep_seconds / 3600.0",
-        "sleep_rem_seconds": "sleep_rem_seconds / 3600.0",
-        "cal_total": "cal_total",
-        "cal_active": "cal_active",
-        "stress_high_minutes": "stress_high_minutes",
-        "recovery_high_minutes": "recovery_high_minutes",
-        "spo2_average": "spo2_average",
-        "vascular_age": "vascular_age",
-        "workout_total_minutes": "workout_total_minutes",
-        "workout_count": "workout_count",
-        "sleep_breath_average": "sleep_breath_average",
-    }
-
-    if metric not in metric_map:
+    if metric not in HEATMAP_METRICS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid metric '{metric}'. Must be one of: {', '.join(sorted(metric_map))}",
+            detail=f"Invalid metric '{metric}'. Must be one of: {', '.join(sorted(HEATMAP_METRICS))}",
         )
 
     if not (1 <= days <= 3660):
         raise HTTPException(status_code=400, detail="days must be between 1 and 3660")
 
-    column = metric_map[metric]
+    column = HEATMAP_METRIC_MAP[metric]
 
     async with get_db_for_user(user_id) as conn:
         async with conn.cursor() as cur:
+            # min/max for color scaling come back on every row as window
+            # aggregates over the same scan.
             await cur.execute(f"""
                 SELECT
                     date,
-                    {column} as value
+                    {column} as value,
+                    MIN({column}) OVER () AS min_value,
+                    MAX({column}) OVER () AS max_value
                 FROM oura_daily
-                WHERE date >= CURRENT_DATE - %(days)s * INTERVAL '1 day'
+                WHERE date >= CURRENT_DATE - %(days)s::int
                 AND user_id = %(user_id)s
                 ORDER BY date
             """, {"user_id": user_id, "days": days})
             rows = await cur.fetchall()
 
-            # Calculate min/max for color scaling
-            values = [r["value"] for r in rows if r["value"] is not None]
-            min_val = min(values) if values else None
-            max_val = max(values) if values else None
+    min_val = rows[0]["min_value"] if rows else None
+    max_val = rows[0]["max_value"] if rows else None
 
+    # Rows come typed from the DB, so per-point validation is skipped.
     return HeatmapResponse(
         metric=metric,
         data=[
-            HeatmapPoint(date=str(r["date"]), value=float(r["value"]) if r["value"] else None)
+            HeatmapPoint.model_construct(
+                date=r["date"], value=float(r["value"]) if r["value"] else None
+            )
             for r in rows
         ],
         min_value=min_val,
@@ -835,7 +809,10 @@ async def get_heatmap(
 
 
 @app.get("/insights/sleep-architecture", response_model=SleepArchitectureResponse)
+@conditional_get
 async def get_sleep_architecture(
+    request: Request,
+    response: Response,
     days: int = Query(30, description="Number of days to show"),
     user: dict = Depends(get_current_user),
 ):
@@ -844,92 +821,88 @@ async def get_sleep_architecture(
 
     async with get_db_for_user(user_id) as conn:
         async with conn.cursor() as cur:
+            # Per-night percentages and the window averages in one pass; the
+            # averages are over the already-rounded nightly values.
             await cur.execute("""
+                WITH nights AS (
+                    SELECT
+                        date,
+                        ROUND(COALESCE(sleep_deep_seconds, 0) * 100.0 / sleep_total_seconds, 1) AS deep_pct,
+                        ROUND(COALESCE(sleep_rem_seconds, 0) * 100.0 / sleep_total_seconds, 1) AS rem_pct,
+                        ROUND(
+                            (sleep_total_seconds - COALESCE(sleep_deep_seconds, 0) - COALESCE(sleep_rem_seconds, 0))
+                            * 100.0 / sleep_total_seconds, 1
+                        ) AS light_pct,
+                        ROUND(sleep_total_seconds / 3600.0, 1) AS total_hours
+                    FROM oura_daily
+                    WHERE date >= CURRENT_DATE - %(days)s::int
+                    AND user_id = %(user_id)s
+                    AND sleep_total_seconds IS NOT NULL
+                    AND sleep_total_seconds > 0
+                )
                 SELECT
                     date,
-                    sleep_total_seconds,
-                    sleep_deep_seconds,
-                    sleep_rem_seconds
-                FROM oura_daily
-                WHERE date >= CURRENT_DATE - %(days)s * INTERVAL '1 day'
-                AND user_id = %(user_id)s
-                AND sleep_total_seconds IS NOT NULL
-                AND sleep_total_seconds > 0
+                    deep_pct::double precision,
+                    rem_pct::double precision,
+                    light_pct::double precision,
+                    total_hours::double precision,
+                    ROUND(AVG(deep_pct) OVER (), 1)::double precision AS avg_deep_pct,
+                    ROUND(AVG(rem_pct) OVER (), 1)::double precision AS avg_rem_pct,
+                    ROUND(AVG(light_pct) OVER (), 1)::double precision AS avg_light_pct
+                FROM nights
                 ORDER BY date
             """, {"days": days, "user_id": user_id})
             rows = await cur.fetchall()
 
-    data = []
-    total_deep_pct = 0
-    total_rem_pct = 0
-    total_light_pct = 0
-    valid_days = 0
-
-    for r in rows:
-        total = r["sleep_total_seconds"]
-        deep = r["sleep_deep_seconds"] or 0
-        rem = r["sleep_rem_seconds"] or 0
-        light = total - deep - rem
-
-        if total > 0:
-            deep_pct = round((deep / total) * 100, 1)
-            rem_pct = round((rem / total) * 100, 1)
-            light_pct = round((light / total) * 100, 1)
-            total_hours = round(total / 3600, 1)
-
-            data.append(SleepArchitectureDay(
-                date=str(r["date"]),
-                deep_pct=deep_pct,
-                rem_pct=rem_pct,
-                light_pct=light_pct,
-                total_hours=total_hours,
-            ))
-
-            total_deep_pct += deep_pct
-            total_rem_pct += rem_pct
-            total_light_pct += light_pct
-            valid_days += 1
-
+    # Every column is cast to double precision above; skip per-night validation.
     return SleepArchitectureResponse(
-        data=data,
-        avg_deep_pct=round(total_deep_pct / valid_days, 1) if valid_days else None,
-        avg_rem_pct=round(total_rem_pct / valid_days, 1) if valid_days else None,
-        avg_light_pct=round(total_light_pct / valid_days, 1) if valid_days else None,
+        data=[
+            SleepArchitectureDay.model_construct(
+                date=r["date"],
+                deep_pct=r["deep_pct"],
+                rem_pct=r["rem_pct"],
+                light_pct=r["light_pct"],
+                total_hours=r["total_hours"],
+            )
+            for r in rows
+        ],
+        avg_deep_pct=rows[0]["avg_deep_pct"] if rows else None,
+        avg_rem_pct=rows[0]["avg_rem_pct"] if rows else None,
+        avg_light_pct=rows[0]["avg_light_pct"] if rows else None,
     )
 
 
 @app.get("/insights/chronotype", response_model=ChronotypeResponse)
-async def get_chronotype(user: dict = Depends(get_current_user)):
+@conditional_get
+async def get_chronotype(
+    request: Request,
+    response: Response,
+    user: dict = Depends(get_current_user),
+):
     """Analyze chronotype and social jetlag from sleep patterns."""
     user_id = user["user_id"]
 
     async with get_db_for_user(user_id) as conn:
         async with conn.cursor() as cur:
-            await cur.execute("""
-                SELECT
-                    date,
-                    is_weekend,
-                    sleep_total_seconds
-                FROM oura_daily
-                WHERE sleep_total_seconds IS NOT NULL
-                AND sleep_total_seconds > 0
-                AND user_id = %s
-                ORDER BY date DESC
-                LIMIT 90
-            """, (user_id,))
-            daily_rows = await cur.fetchall()
-
-            # Query raw sleep data for bedtime_start and bedtime_end
+            # Local wall-clock bedtime start (the ISO string's own offset, as
+            # Oura reports it) and the absolute sleep duration; malformed
+            # timestamps come back as NULL and are skipped.
             await cur.execute("""
                 SELECT
                     r.day as date,
-                    r.payload->>'bedtime_start' as bedtime_start,
-                    r.payload->>'bedtime_end' as bedtime_end,
+                    CASE WHEN pg_input_is_valid(r.bedtime_start, 'timestamptz')
+                         AND pg_input_is_valid(r.bedtime_end, 'timestamptz')
+                    THEN left(r.bedtime_start, 19)::timestamp END AS start_local,
+                    CASE WHEN pg_input_is_valid(r.bedtime_start, 'timestamptz')
+                         AND pg_input_is_valid(r.bedtime_end, 'timestamptz')
+                    THEN EXTRACT(EPOCH FROM (
+                        r.bedtime_end::timestamptz - r.bedtime_start::timestamptz
+                    ))::double precision END AS duration_seconds,
                     d.is_weekend
                 FROM oura_raw r
                 JOIN oura_daily d ON r.day = d.date AND r.user_id = d.user_id
                 WHERE r.source = 'sleep'
-                AND r.payload->>'type' = 'long_sleep'
+                AND r.sleep_type = 'long_sleep'
                 AND r.user_id = %s
                 ORDER BY r.day DESC
                 LIMIT 90
@@ -947,34 +920,23 @@ async def get_chronotype(user: dict = Depends(get_current_user)):
             recommendation="Need more sleep data to determine chronotype.",
         )
 
-    from datetime import datetime
-
-    def parse_sleep_midpoint(bedtime_start: str, bedtime_end: str) -> float | None:
-        """Calculate sleep midpoint as hours from midnight."""
-        try:
-            start = datetime.fromisoformat(bedtime_start.replace("Z", "+00:00"))
-            end = datetime.fromisoformat(bedtime_end.replace("Z", "+00:00"))
-            midpoint = start + (end - start) / 2
-            hours = midpoint.hour + midpoint.minute / 60
-            if hours < 6:
-                hours += 24
-            return hours
-        except (ValueError, TypeError):
-            return None
-
-    weekend_midpoints = []
-    weekday_midpoints = []
-
-    for r in raw_rows:
-        if r["bedtime_start"] and r["bedtime_end"]:
-            midpoint = parse_sleep_midpoint(r["bedtime_start"], r["bedtime_end"])
-            if midpoint:
-                if r["is_weekend"]:
-                    weekend_midpoints.append(midpoint)
-                else:
-                    weekday_midpoints.append(midpoint)
-
-    if not weekend_midpoints or not weekday_midpoints:
+    valid_rows = [r for r in raw_rows if r["start_local"] is not None]
+    starts = np.array([r["start_local"] for r in valid_rows], dtype="datetime64[us]")
+    half_durations = np.array(
+        [r["duration_seconds"] * 1e6 / 2 for r in valid_rows]
+    ).astype("timedelta64[us]")
+    is_weekend = np.array([r["is_weekend"] for r in valid_rows], dtype=bool)
+
+    # Sleep midpoint as hours from midnight at minute resolution; early-morning
+    # midpoints count past midnight (e.g. 03:00 -> 27.0).
+    midpoints = starts + half_durations
+    minutes = (midpoints - midpoints.astype("datetime64[D]")) // np.timedelta64(1, "m")
+    hours = minutes / 60
+    hours = np.where(hours < 6, hours + 24, hours)
+    weekend_midpoints = hours[is_weekend]
+    weekday_midpoints = hours[~is_weekend]
+
+    if not weekend_midpoints.size or not weekday_midpoints.size:
         return ChronotypeResponse(
             chronotype="unknown",
             chronotype_label="Insufficient Data",
@@ -985,8 +947,8 @@ async def get_chronotype(user: dict = Depends(get_current_user)):
             recommendation="Need more weekend and weekday sleep data.",
         )
 
-    avg_weekend = sum(weekend_midpoints) / len(weekend_midpoints)
-    avg_weekday = sum(weekday_midpoints) / len(weekday_midpoints)
+    avg_weekend = float(weekend_midpoints.mean())
+    avg_weekday = float(weekday_midpoints.mean())
     jetlag_hours = abs(avg_weekend - avg_weekday)
     jetlag_minutes = int(jetlag_hours * 60)
 
@@ -1087,6 +1049,7 @@ async def chat_endpoint(
     return StreamingResponse(
         run_chat(user["user_id"], body.message, body.conversation_id),
         media_type="application/x-ndjson",
+        headers={"Content-Encoding": "identity"},
     )
 
 
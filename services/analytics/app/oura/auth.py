@@ -1,5 +1,6 @@
 """Oura OAuth token management (multi-user)."""
 
+import asyncio
 import secrets
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
@@ -12,6 +13,24 @@ from app.settings import settings
 # Optional Fernet encryption for tokens at rest
 _fernet = None
 
+# Shared client for the token endpoint (code exchange and refresh)
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared token-endpoint client (app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 def _get_fernet():
     global _fernet
@@ -42,6 +61,25 @@ def _decrypt(value: str) -> str:
     return f.decrypt(value.encode()).decode()
 
 
+# Decrypted access tokens per user: (token, expires_at, cached_until). Entries
+# also expire after a few minutes so a disconnect or refresh made by another
+# worker process is picked up.
+_TOKEN_CACHE_TTL = timedelta(minutes=5)
+_token_cache: dict[str, tuple[str, datetime, datetime]] = {}
+_token_locks: dict[str, asyncio.Lock] = {}
+
+
+def _cached_access_token(user_id: str) -> str | None:
+    entry = _token_cache.get(user_id)
+    if entry is None:
+        return None
+    token, expires_at, cached_until = entry
+    now = datetime.now(timezone.utc)
+    if now >= cached_until or expires_at <= now + timedelta(minutes=2):
+        return None
+    return token
+
+
 class OAuthError(Exception):
     pass
 
@@ -100,46 +138,45 @@ async def consume_oauth_state(state: str, user_id: str) -> bool:
 
 async def exchange_code(code: str) -> dict:
     """Exchange authorization code for tokens."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            settings.oura_token_url,
-            data={
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": settings.oura_redirect_uri,
-                "client_id": settings.oura_client_id,
-                "client_secret": settings.oura_client_secret,
-            },
-        )
+    response = await _get_http_client().post(
+        settings.oura_token_url,
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": settings.oura_redirect_uri,
+            "client_id": settings.oura_client_id,
+            "client_secret": settings.oura_client_secret,
+        },
+    )
 
-        if response.status_code != 200:
-            raise OAuthError(f"Token exchange failed: {response.text}")
+    if response.status_code != 200:
+        raise OAuthError(f"Token exchange failed: {response.text}")
 
-        return response.json()
+    return response.json()
 
 
 async def refresh_access_token(refresh_token: str) -> dict:
     """Refresh the access token using a refresh token."""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            settings.oura_token_url,
-            data={
-                "grant_type": "refresh_token",
-                "refresh_token": refresh_token,
-                "client_id": settings.oura_client_id,
-                "client_secret": settings.oura_client_secret,
-            },
-        )
+    response = await _get_http_client().post(
+        settings.oura_token_url,
+        data={
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+            "client_id": settings.oura_client_id,
+            "client_secret": settings.oura_client_secret,
+        },
+    )
 
-        if response.status_code != 200:
-            raise OAuthError(f"Token refresh failed: {response.text}")
+    if response.status_code != 200:
+        raise OAuthError(f"Token refresh failed: {response.text}")
 
-        return response.json()
+    return response.json()
 
 
 async def store_tokens(tokens: dict, user_id: str) -> None:
     """Store OAuth tokens in the database (encrypted at rest)."""
     expires_at = datetime.now(timezone.utc) + timedelta(seconds=tokens["expires_in"])
+    _token_cache.pop(user_id, None)
 
     async with get_db_for_user(user_id) as conn:
         await conn.execute(
@@ -170,47 +207,83 @@ async def get_auth_record(user_id: str) -> dict | None:
     async with get_db_for_user(user_id) as conn:
         async with conn.cursor() as cur:
             await cur.execute(
-                "SELECT * FROM oura_auth WHERE user_id = %s", (user_id,)
+                """
+                SELECT access_token, refresh_token, expires_at, token_type, scope
+                FROM oura_auth WHERE user_id = %s
+                """,
+                (user_id,),
             )
             row = await cur.fetchone()
             if not row:
                 return None
-            result = dict(row)
-            result["access_token"] = _decrypt(result["access_token"])
-            result["refresh_token"] = _decrypt(result["refresh_token"])
-            return result
+            row["access_token"] = _decrypt(row["access_token"])
+            row["refresh_token"] = _decrypt(row["refresh_token"])
+            return row
 
 
 async def get_valid_access_token(user_id: str) -> str:
-    """Get a valid access token for a user, refreshing if necessary."""
-    auth = await get_auth_record(user_id)
-
-    if not auth:
-        raise OAuthError("Not connected to Oura. Please authorize first.")
-
-    expires_at = auth["expires_at"]
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-    buffer_time = datetime.now(timezone.utc) + timedelta(minutes=2)
+    """Get a valid access token for a user, refreshing if necessary.
 
-    if expires_at <= buffer_time:
-        try:
-            new_tokens = await refresh_access_token(auth["refresh_token"])
-            await store_tokens(new_tokens, user_id)
-            return new_tokens["access_token"]
-        except OAuthError as e:
-            await clear_auth(user_id)
-            raise TokenExpiredError(
-                "Oura connection expired. Please reconnect."
-            ) from e
-
-    return auth["access_token"]
+    Served from the in-process cache when possible. Misses are serialized per
+    user, so concurrent fetches never race to spend the same refresh token.
+    """
+    token = _cached_access_token(user_id)
+    if token is not None:
+        return token
+
+    async with _token_locks.setdefault(user_id, asyncio.Lock()):
+        token = _cached_access_token(user_id)
+        if token is not None:
+            return token
+
+        auth = await get_auth_record(user_id)
+
+        if not auth:
+            raise OAuthError("Not connected to Oura. Please authorize first.")
+
+        expires_at = auth["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+        now = datetime.now(timezone.utc)
+        buffer_time = now + timedelta(minutes=2)
+
+        if expires_at <= buffer_time:
+            try:
+                new_tokens = await refresh_access_token(auth["refresh_token"])
+                await store_tokens(new_tokens, user_id)
+            except OAuthError as e:
+                await clear_auth(user_id)
+                raise TokenExpiredError(
+                    "Oura connection expired. Please reconnect."
+                ) from e
+            token = new_tokens["access_token"]
+            expires_at = now + timedelta(seconds=new_tokens["expires_in"])
+        else:
+            token = auth["access_token"]
+
+        _token_cache[user_id] = (token, expires_at, now + _TOKEN_CACHE_TTL)
+        return token
+
+
+async def _get_oura_email(user_id: str) -> str | None:
+    """Oura account email from stored personal info, if any."""
+    async with get_db_for_user(user_id) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT email FROM oura_personal_info WHERE user_id = %s",
+                (user_id,),
+            )
+            row = await cur.fetchone()
+            return row["email"] if row else None
 
 
 async def get_auth_status(user_id: str) -> dict:
     """Get current authentication status for a user."""
-    auth = await get_auth_record(user_id)
+    # Independent lookups; run them on two pooled connections at once.
+    auth, oura_email = await asyncio.gather(
+        get_auth_record(user_id), _get_oura_email(user_id)
+    )
 
     if not auth:
         return {"connected": False}
@@ -221,18 +294,6 @@ async def get_auth_status(user_id: str) -> dict:
 
     scopes = auth.get("scope", "").split() if auth.get("scope") else []
 
-    # Fetch Oura account email from personal info
-    oura_email = None
-    async with get_db_for_user(user_id) as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                "SELECT email FROM oura_personal_info WHERE user_id = %s",
-                (user_id,),
-            )
-            row = await cur.fetchone()
-            if row:
-                oura_email = row["email"]
-
     return {
         "connected": True,
         "expires_at": expires_at.isoformat(),
@@ -243,6 +304,7 @@ async def get_auth_status(user_id: str) -> dict:
 
 async def clear_auth(user_id: str) -> None:
     """Clear the stored authentication for a user."""
+    _token_cache.pop(user_id, None)
     async with get_db_for_user(user_id) as conn:
         await conn.execute(
             "DELETE FROM oura_auth WHERE user_id = %s", (user_id,)
@@ -35,6 +35,28 @@ class OuraClient:
         self.base_url = settings.oura_api_base_url
         self.max_retries = 3
         self.base_delay = 2.0
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(settings.oura_max_concurrent_requests)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, so keep-alive connections to Oura are reused."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=32,
+                    max_keepalive_connections=16,
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client (app shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def _request(
         self,
@@ -42,71 +64,56 @@ class OuraClient:
         endpoint: str,
         user_id: str,
         params: dict[str, Any] | None = None,
-        retry_count: int = 0,
     ) -> dict[str, Any]:
-        """Make an authenticated request to the Oura API."""
-        token = await get_valid_access_token(user_id)
-
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.request(
-                    method,
-                    f"{self.base_url}{endpoint}",
-                    params=params,
-                    headers={"Authorization": f"Bearer {token}"},
-                    timeout=30.0,
-                )
-
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", "60"))
-                    if retry_count < self.max_retries:
-                        delay = min(retry_after, self.base_delay * (2**retry_count))
-                        await asyncio.sleep(delay)
-                        return await self._request(
-                            method, endpoint, user_id, params, retry_count + 1
+        """Make an authenticated request to the Oura API.
+
+        Rate limits, server errors and transport failures are retried with
+        exponential backoff. The concurrency slot is held across retries, so
+        backing off also throttles the rest of a fetch_all fan-out.
+        """
+        client = self._get_client()
+        error: OuraAPIError | None = None
+
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                delay = self.base_delay * (2**attempt)
+                token = await get_valid_access_token(user_id)
+                try:
+                    response = await client.request(
+                        method,
+                        endpoint,
+                        params=params,
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                except httpx.TimeoutException:
+                    error = OuraAPIError(0, "Request timeout")
+                except httpx.RequestError as e:
+                    error = OuraAPIError(0, f"Request failed: {e}")
+                else:
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get("Retry-After", "60"))
+                        error = OuraRateLimitError(retry_after)
+                        delay = min(retry_after, delay)
+                    elif response.status_code >= 500:
+                        error = OuraAPIError(
+                            response.status_code, "Server error", response.text,
                         )
-                    raise OuraRateLimitError(retry_after)
-
-                if response.status_code >= 500:
-                    if retry_count < self.max_retries:
-                        delay = self.base_delay * (2**retry_count)
-                        await asyncio.sleep(delay)
-                        return await self._request(
-                            method, endpoint, user_id, params, retry_count + 1
+                    elif response.status_code == 401:
+                        raise OuraAPIError(
+                            401, "Unauthorized - token may be invalid", response.text,
                         )
-                    raise OuraAPIError(
-                        response.status_code, "Server error", response.text,
-                    )
-
-                if response.status_code == 401:
-                    raise OuraAPIError(
-                        401, "Unauthorized - token may be invalid", response.text,
-                    )
-
-                if response.status_code >= 400:
-                    raise OuraAPIError(
-                        response.status_code, f"API error: {response.text}", response.text,
-                    )
-
-                return response.json()
+                    elif response.status_code >= 400:
+                        raise OuraAPIError(
+                            response.status_code, f"API error: {response.text}", response.text,
+                        )
+                    else:
+                        return response.json()
 
-            except httpx.TimeoutException:
-                if retry_count < self.max_retries:
-                    delay = self.base_delay * (2**retry_count)
+                if attempt < self.max_retries:
                     await asyncio.sleep(delay)
-                    return await self._request(
-                        method, endpoint, user_id, params, retry_count + 1
-                    )
-                raise OuraAPIError(0, "Request timeout")
 
-            except httpx.RequestError as e:
-                if retry_count < self.max_retries:
-                    delay = self.base_delay * (2**retry_count)
-                    await asyncio.sleep(delay)
-                    return await self._request(
-                        method, endpoint, user_id, params, retry_count + 1
-                    )
-                raise OuraAPIError(0, f"Request failed: {e}")
+        assert error is not None
+        raise error
 
     async def _request_all_pages(
         self,
@@ -164,7 +171,7 @@ class OuraClient:
             if not isinstance(value, str):
                 continue
             try:
-                return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+                return datetime.fromisoformat(value).date()
             except ValueError:
                 continue
 
@@ -272,6 +279,43 @@ class OuraClient:
             params={"start_date": str(start_date), "end_date": str(end_date)},
         )
 
+    async def fetch_all(
+        self,
+        start_date: date,
+        end_date: date,
+        user_id: str,
+        kinds: list[str] | None = None,
+    ) -> dict[str, list[dict[str, Any]] | Exception]:
+        """Fetch several data types concurrently, keyed by oura_raw source name.
+
+        Each value is the fetched records, or the exception that fetch raised.
+        Unknown kinds are skipped. Concurrency is bounded by the per-client
+        request semaphore.
+        """
+        fetchers = {
+            "daily_sleep": self.fetch_daily_sleep,
+            "sleep": self.fetch_sleep_sessions,
+            "daily_readiness": self.fetch_daily_readiness,
+            "daily_activity": self.fetch_daily_activity,
+            "daily_stress": self.fetch_daily_stress,
+            "daily_spo2": self.fetch_daily_spo2,
+            "daily_cardiovascular_age": self.fetch_daily_cardiovascular_age,
+            "tag": self.fetch_tags,
+            "workout": self.fetch_workouts,
+            "session": self.fetch_sessions,
+        }
+        if kinds is None:
+            kinds = list(fetchers)
+        kinds = [k for k in kinds if k in fetchers]
+        results = await asyncio.gather(
+            *(fetchers[k](start_date, end_date, user_id) for k in kinds),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return dict(zip(kinds, results))
+
     async def find_oldest_data_date(self, user_id: str) -> date | None:
         """Find the oldest available day in the user's Oura history."""
         today = date.today()
@@ -1,13 +1,30 @@
 """Ingestion pipeline: Oura API -> raw -> daily tables (multi-user)."""
 
 import asyncio
-import json
+from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
-from typing import Any, AsyncGenerator, Awaitable, Callable
+from typing import Any, AsyncGenerator, Awaitable, Callable, Iterable
+
+from psycopg.types.json import Jsonb
 
 from app.db import get_db_for_user
 from app.oura.client import oura_client
 
+# Raw sources where only the latest fetch of a day counts, and those where
+# every record of a day is used (sleep sessions, workouts, sessions).
+_LATEST_PER_DAY_SOURCES = (
+    "daily_sleep", "daily_readiness", "daily_activity", "daily_stress",
+    "daily_spo2", "daily_cardiovascular_age",
+)
+_ALL_PER_DAY_SOURCES = ("sleep", "workout", "session")
+# Per-interval series in sleep payloads that normalization never reads. They
+# are most of each document, so they are stripped server-side rather than
+# shipped and JSON-decoded (daily_activity's class_5_min/met.items likewise).
+_SLEEP_SERIES_KEYS = ("heart_rate", "hrv", "movement_30_sec", "sleep_phase_5_min")
+
+# Meteorological (northern hemisphere) season by month, January first
+_SEASONS = ("winter",) * 2 + ("spring",) * 3 + ("summer",) * 3 + ("fall",) * 3 + ("winter",)
+
 
 def resolve_sleep_day(sleep_session: dict[str, Any]) -> date | None:
     """Map a sleep session to the date of waking up."""
@@ -20,7 +37,7 @@ def resolve_sleep_day(sleep_session: dict[str, Any]) -> date | None:
 
     if isinstance(bedtime_end, str):
         try:
-            dt = datetime.fromisoformat(bedtime_end.replace("Z", "+00:00"))
+            dt = datetime.fromisoformat(bedtime_end)
             return dt.date()
         except ValueError:
             return None
@@ -112,33 +129,24 @@ async def ingest_raw_data(
 
     counts: dict[str, int] = {}
 
-    fetch_map = {
-        "daily_sleep": oura_client.fetch_daily_sleep,
-        "sleep": oura_client.fetch_sleep_sessions,
-        "daily_readiness": oura_client.fetch_daily_readiness,
-        "daily_activity": oura_client.fetch_daily_activity,
-        "daily_stress": oura_client.fetch_daily_stress,
-        "daily_spo2": oura_client.fetch_daily_spo2,
-        "daily_cardiovascular_age": oura_client.fetch_daily_cardiovascular_age,
-        "tag": oura_client.fetch_tags,
-        "workout": oura_client.fetch_workouts,
-        "session": oura_client.fetch_sessions,
-    }
+    # All types are fetched concurrently before the DB connection is taken, so
+    # no transaction sits open while waiting on the Oura API.
+    fetched = await oura_client.fetch_all(start_date, end_date, user_id, data_types)
+
+    fetched_at = datetime.now(timezone.utc)
 
     async with get_db_for_user(user_id) as conn:
         total_types = len(data_types)
         completed_types = 0
         for data_type in data_types:
-            if data_type not in fetch_map:
+            if data_type not in fetched:
                 completed_types += 1
                 if progress_callback is not None:
                     await progress_callback(data_type, completed_types, total_types)
                 continue
 
-            fetch_fn = fetch_map[data_type]
-            try:
-                records = await fetch_fn(start_date, end_date, user_id)
-            except Exception:
+            records = fetched[data_type]
+            if isinstance(records, Exception):
                 counts[data_type] = 0
                 completed_types += 1
                 if progress_callback is not None:
@@ -146,22 +154,26 @@ async def ingest_raw_data(
                 continue
             counts[data_type] = len(records)
 
-            for record in records:
-                day = resolve_raw_record_day(data_type, record)
-
-                await conn.execute(
-                    """
-                    INSERT INTO oura_raw (user_id, source, day, payload, fetched_at)
-                    VALUES (%(user_id)s, %(source)s, %(day)s, %(payload)s, %(fetched_at)s)
-                    """,
-                    {
-                        "user_id": user_id,
-                        "source": data_type,
-                        "day": day,
-                        "payload": json.dumps(record),
-                        "fetched_at": datetime.now(timezone.utc),
-                    },
-                )
+            if records:
+                async with conn.cursor() as cur:
+                    await cur.executemany(
+                        """
+                        INSERT INTO oura_raw (user_id, source, day, payload, fetched_at)
+                        VALUES (%(user_id)s, %(source)s, %(day)s, %(payload)s, %(fetched_at)s)
+                        ON CONFLICT (user_id, source, day, payload_md5)
+                        DO UPDATE SET fetched_at = EXCLUDED.fetched_at
+                        """,
+                        [
+                            {
+                                "user_id": user_id,
+                                "source": data_type,
+                                "day": resolve_raw_record_day(data_type, record),
+                                "payload": Jsonb(record),
+                                "fetched_at": fetched_at,
+                            }
+                            for record in records
+                        ],
+                    )
 
             completed_types += 1
             if progress_callback is not None:
@@ -170,6 +182,278 @@ async def ingest_raw_data(
     return counts
 
 
+def _total_minutes(records: Iterable[dict[str, Any]]) -> float:
+    """Summed start-to-end duration of workout/session records, in minutes."""
+    total = 0.0
+    for record in records:
+        start_dt = record.get("start_datetime")
+        end_dt = record.get("end_datetime")
+        if start_dt and end_dt:
+            try:
+                s = datetime.fromisoformat(start_dt)
+                e = datetime.fromisoformat(end_dt)
+                total += (e - s).total_seconds() / 60
+            except (ValueError, TypeError):
+                pass
+    return total
+
+
+def _daily_row(
+    user_id: str,
+    day: date,
+    daily: dict[str, dict[str, Any]],
+    sleep_session_data: dict[str, Any],
+    workout_payloads: list[dict[str, Any]],
+    session_payloads: list[dict[str, Any]],
+) -> dict[str, Any] | None:
+    """Flatten one day's payloads into oura_daily upsert parameters.
+
+    `daily` maps each one-per-day source to its latest payload. Returns None
+    when neither a daily source nor the primary sleep session has data.
+    """
+    daily_sleep_data = daily.get("daily_sleep", {})
+    readiness_data = daily.get("daily_readiness", {})
+    activity_data = daily.get("daily_activity", {})
+    stress_data = daily.get("daily_stress", {})
+    spo2_data = daily.get("daily_spo2", {})
+    cardio_age_data = daily.get("daily_cardiovascular_age", {})
+
+    weekday = day.weekday()
+    is_weekend = weekday >= 5
+    season = _SEASONS[day.month - 1]
+
+    sleep_total = sleep_session_data.get("total_sleep_duration")
+    sleep_efficiency = sleep_session_data.get("efficiency")
+    sleep_rem = sleep_session_data.get("rem_sleep_duration")
+    sleep_deep = sleep_session_data.get("deep_sleep_duration")
+    sleep_latency = sleep_session_data.get("latency")
+    sleep_restfulness = sleep_session_data.get("restless_periods")
+    sleep_score = daily_sleep_data.get("score")
+
+    hrv_average = sleep_session_data.get("average_hrv")
+    hr_lowest = sleep_session_data.get("lowest_heart_rate")
+    hr_average = sleep_session_data.get("average_heart_rate")
+
+    readiness_score = readiness_data.get("score")
+    readiness_contributors = readiness_data.get("contributors", {})
+    readiness_temp = readiness_contributors.get("body_temperature")
+    readiness_rhr = readiness_contributors.get("resting_heart_rate")
+    readiness_hrv = readiness_contributors.get("hrv_balance")
+    readiness_recovery = readiness_contributors.get("recovery_index")
+    readiness_activity = readiness_contributors.get("activity_balance")
+
+    activity_score = activity_data.get("score")
+    steps = activity_data.get("steps")
+    cal_total = activity_data.get("total_calories")
+    cal_active = activity_data.get("active_calories")
+    met_minutes = activity_data.get("met", {}).get("minutes") if isinstance(activity_data.get("met"), dict) else activity_data.get("equivalent_walking_distance")
+    low_activity = activity_data.get("low_activity_met_minutes")
+    medium_activity = activity_data.get("medium_activity_met_minutes")
+    high_activity = activity_data.get("high_activity_met_minutes")
+    sedentary = activity_data.get("sedentary_met_minutes")
+
+    stress_high_raw = stress_data.get("stress_high")
+    recovery_high_raw = stress_data.get("recovery_high")
+    stress_high = round(stress_high_raw / 60) if stress_high_raw else stress_high_raw
+    recovery_high = round(recovery_high_raw / 60) if recovery_high_raw else recovery_high_raw
+    stress_day_summary = stress_data.get("day_summary")
+
+    spo2_percentage = spo2_data.get("spo2_percentage", {})
+    spo2_average = spo2_percentage.get("average") if isinstance(spo2_percentage, dict) else None
+    if spo2_average is not None and spo2_average == 0:
+        spo2_average = None
+    breathing_disturbance = spo2_data.get("breathing_disturbance_index")
+
+    vascular_age = cardio_age_data.get("vascular_age")
+    sleep_breath_average = sleep_session_data.get("average_breath")
+
+    activity_contributors = activity_data.get("contributors", {})
+    if not isinstance(activity_contributors, dict):
+        activity_contributors = {}
+    activity_meet_daily_targets = activity_contributors.get("meet_daily_targets")
+    activity_move_every_hour = activity_contributors.get("move_every_hour")
+    activity_recovery_time = activity_contributors.get("recovery_time")
+    activity_training_frequency = activity_contributors.get("training_frequency")
+    activity_training_volume = activity_contributors.get("training_volume")
+    non_wear = activity_data.get("non_wear_minutes")
+    inactivity_alerts_val = activity_data.get("inactivity_alerts")
+
+    readiness_sleep_balance = readiness_contributors.get("sleep_balance")
+
+    # Workout aggregation (records come oldest fetch first, so the
+    # latest copy of a re-fetched workout wins)
+    unique_workouts = {payload.get("id", ""): payload for payload in workout_payloads}
+    workout_count = len(unique_workouts)
+    workout_total_minutes = None
+    workout_total_calories = None
+    if workout_count > 0:
+        total_minutes = _total_minutes(unique_workouts.values())
+        total_cal = sum(wp.get("calories", 0) or 0 for wp in unique_workouts.values())
+        workout_total_minutes = round(total_minutes, 1) if total_minutes else None
+        workout_total_calories = round(total_cal, 1) if total_cal else None
+
+    # Session aggregation
+    unique_sessions = {payload.get("id", ""): payload for payload in session_payloads}
+    session_count = len(unique_sessions)
+    session_total_minutes = None
+    if session_count > 0:
+        total_minutes = _total_minutes(unique_sessions.values())
+        session_total_minutes = round(total_minutes, 1) if total_minutes else None
+
+    has_data = (
+        daily_sleep_data or sleep_session_data or readiness_data
+        or activity_data or stress_data or spo2_data or cardio_age_data
+    )
+    if not has_data:
+        return None
+
+    return {
+        "user_id": user_id,
+        "date": day,
+        "weekday": weekday,
+        "is_weekend": is_weekend,
+        "season": season,
+        "is_holiday": False,
+        "sleep_total_seconds": sleep_total,
+        "sleep_efficiency": sleep_efficiency,
+        "sleep_rem_seconds": sleep_rem,
+        "sleep_deep_seconds": sleep_deep,
+        "sleep_latency_seconds": sleep_latency,
+        "sleep_restlessness": sleep_restfulness,
+        "sleep_score": sleep_score,
+        "readiness_score": readiness_score,
+        "readiness_temperature_deviation": readiness_temp,
+        "readiness_resting_heart_rate": readiness_rhr,
+        "readiness_hrv_balance": readiness_hrv,
+        "readiness_recovery_index": readiness_recovery,
+        "readiness_activity_balance": readiness_activity,
+        "activity_score": activity_score,
+        "steps": steps,
+        "cal_total": cal_total,
+        "cal_active": cal_active,
+        "met_minutes": met_minutes,
+        "low_activity_minutes": low_activity,
+        "medium_activity_minutes": medium_activity,
+        "high_activity_minutes": high_activity,
+        "sedentary_minutes": sedentary,
+        "hr_lowest": hr_lowest,
+        "hr_average": hr_average,
+        "hrv_average": hrv_average,
+        "stress_high_minutes": stress_high,
+        "recovery_high_minutes": recovery_high,
+        "stress_day_summary": stress_day_summary,
+        "spo2_average": spo2_average,
+        "breathing_disturbance_index": breathing_disturbance,
+        "vascular_age": vascular_age,
+        "sleep_breath_average": sleep_breath_average,
+        "activity_meet_daily_targets": activity_meet_daily_targets,
+        "activity_move_every_hour": activity_move_every_hour,
+        "activity_recovery_time": activity_recovery_time,
+        "activity_training_frequency": activity_training_frequency,
+        "activity_training_volume": activity_training_volume,
+        "non_wear_seconds": non_wear,
+        "inactivity_alerts": inactivity_alerts_val,
+        "readiness_sleep_balance": readiness_sleep_balance,
+        "workout_count": workout_count,
+        "workout_total_minutes": workout_total_minutes,
+        "workout_total_calories": workout_total_calories,
+        "session_count": session_count,
+        "session_total_minutes": session_total_minutes,
+    }
+
+
+_UPSERT_DAILY_SQL = """
+    INSERT INTO oura_daily (
+        user_id, date, weekday, is_weekend, season, is_holiday,
+        sleep_total_seconds, sleep_efficiency, sleep_rem_seconds,
+        sleep_deep_seconds, sleep_latency_seconds, sleep_restlessness, sleep_score,
+        readiness_score, readiness_temperature_deviation, readiness_resting_heart_rate,
+        readiness_hrv_balance, readiness_recovery_index, readiness_activity_balance,
+        activity_score, steps, cal_total, cal_active, met_minutes,
+        low_activity_minutes, medium_activity_minutes, high_activity_minutes, sedentary_minutes,
+        hr_lowest, hr_average, hrv_average,
+        stress_high_minutes, recovery_high_minutes, stress_day_summary,
+        spo2_average, breathing_disturbance_index, vascular_age,
+        sleep_breath_average,
+        activity_meet_daily_targets, activity_move_every_hour,
+        activity_recovery_time, activity_training_frequency, activity_training_volume,
+        non_wear_seconds, inactivity_alerts,
+        readiness_sleep_balance,
+        workout_count, workout_total_minutes, workout_total_calories,
+        session_count, session_total_minutes
+    )
+    VALUES (
+        %(user_id)s, %(date)s, %(weekday)s, %(is_weekend)s, %(season)s, %(is_holiday)s,
+        %(sleep_total_seconds)s, %(sleep_efficiency)s, %(sleep_rem_seconds)s,
+        %(sleep_deep_seconds)s, %(sleep_latency_seconds)s, %(sleep_restlessness)s, %(sleep_score)s,
+        %(readiness_score)s, %(readiness_temperature_deviation)s, %(readiness_resting_heart_rate)s,
+        %(readiness_hrv_balance)s, %(readiness_recovery_index)s, %(readiness_activity_balance)s,
+        %(activity_score)s, %(steps)s, %(cal_total)s, %(cal_active)s, %(met_minutes)s,
+        %(low_activity_minutes)s, %(medium_activity_minutes)s, %(high_activity_minutes)s, %(sedentary_minutes)s,
+        %(hr_lowest)s, %(hr_average)s, %(hrv_average)s,
+        %(stress_high_minutes)s, %(recovery_high_minutes)s, %(stress_day_summary)s,
+        %(spo2_average)s, %(breathing_disturbance_index)s, %(vascular_age)s,
+        %(sleep_breath_average)s,
+        %(activity_meet_daily_targets)s, %(activity_move_every_hour)s,
+        %(activity_recovery_time)s, %(activity_training_frequency)s, %(activity_training_volume)s,
+        %(non_wear_seconds)s, %(inactivity_alerts)s,
+        %(readiness_sleep_balance)s,
+        %(workout_count)s, %(workout_total_minutes)s, %(workout_total_calories)s,
+        %(session_count)s, %(session_total_minutes)s
+    )
+    ON CONFLICT (user_id, date) DO UPDATE SET
+        weekday = EXCLUDED.weekday,
+        is_weekend = EXCLUDED.is_weekend,
+        season = EXCLUDED.season,
+        sleep_total_seconds = COALESCE(EXCLUDED.sleep_total_seconds, oura_daily.sleep_total_seconds),
+        sleep_efficiency = COALESCE(EXCLUDED.sleep_efficiency, oura_daily.sleep_efficiency),
+        sleep_rem_seconds = COALESCE(EXCLUDED.sleep_rem_seconds, oura_daily.sleep_rem_seconds),
+        sleep_deep_seconds = COALESCE(EXCLUDED.sleep_deep_seconds, oura_daily.sleep_deep_seconds),
+        sleep_latency_seconds = COALESCE(EXCLUDED.sleep_latency_seconds, oura_daily.sleep_latency_seconds),
+        sleep_restlessness = COALESCE(EXCLUDED.sleep_restlessness, oura_daily.sleep_restlessness),
+        sleep_score = COALESCE(EXCLUDED.sleep_score, oura_daily.sleep_score),
+        readiness_score = COALESCE(EXCLUDED.readiness_score, oura_daily.readiness_score),
+        readiness_temperature_deviation = COALESCE(EXCLUDED.readiness_temperature_deviation, oura_daily.readiness_temperature_deviation),
+        readiness_resting_heart_rate = COALESCE(EXCLUDED.readiness_resting_heart_rate, oura_daily.readiness_resting_heart_rate),
+        readiness_hrv_balance = COALESCE(EXCLUDED.readiness_hrv_balance, oura_daily.readiness_hrv_balance),
+        readiness_recovery_index = COALESCE(EXCLUDED.readiness_recovery_index, oura_daily.readiness_recovery_index),
+        readiness_activity_balance = COALESCE(EXCLUDED.readiness_activity_balance, oura_daily.readiness_activity_balance),
+        activity_score = COALESCE(EXCLUDED.activity_score, oura_daily.activity_score),
+        steps = COALESCE(EXCLUDED.steps, oura_daily.steps),
+        cal_total = COALESCE(EXCLUDED.cal_total, oura_daily.cal_total),
+        cal_active = COALESCE(EXCLUDED.cal_active, oura_daily.cal_active),
+        met_minutes = COALESCE(EXCLUDED.met_minutes, oura_daily.met_minutes),
+        low_activity_minutes = COALESCE(EXCLUDED.low_activity_minutes, oura_daily.low_activity_minutes),
+        medium_activity_minutes = COALESCE(EXCLUDED.medium_activity_minutes, oura_daily.medium_activity_minutes),
+        high_activity_minutes = COALESCE(EXCLUDED.high_activity_minutes, oura_daily.high_activity_minutes),
+        sedentary_minutes = COALESCE(EXCLUDED.sedentary_minutes, oura_daily.sedentary_minutes),
+        hr_lowest = COALESCE(EXCLUDED.hr_lowest, oura_daily.hr_lowest),
+        hr_average = COALESCE(EXCLUDED.hr_average, oura_daily.hr_average),
+        hrv_average = COALESCE(EXCLUDED.hrv_average, oura_daily.hrv_average),
+        stress_high_minutes = COALESCE(EXCLUDED.stress_high_minutes, oura_daily.stress_high_minutes),
+        recovery_high_minutes = COALESCE(EXCLUDED.recovery_high_minutes, oura_daily.recovery_high_minutes),
+        stress_day_summary = COALESCE(EXCLUDED.stress_day_summary, oura_daily.stress_day_summary),
+        spo2_average = COALESCE(EXCLUDED.spo2_average, oura_daily.spo2_average),
+        breathing_disturbance_index = COALESCE(EXCLUDED.breathing_disturbance_index, oura_daily.breathing_disturbance_index),
+        vascular_age = COALESCE(EXCLUDED.vascular_age, oura_daily.vascular_age),
+        sleep_breath_average = COALESCE(EXCLUDED.sleep_breath_average, oura_daily.sleep_breath_average),
+        activity_meet_daily_targets = COALESCE(EXCLUDED.activity_meet_daily_targets, oura_daily.activity_meet_daily_targets),
+        activity_move_every_hour = COALESCE(EXCLUDED.activity_move_every_hour, oura_daily.activity_move_every_hour),
+        activity_recovery_time = COALESCE(EXCLUDED.activity_recovery_time, oura_daily.activity_recovery_time),
+        activity_training_frequency = COALESCE(EXCLUDED.activity_training_frequency, oura_daily.activity_training_frequency),
+        activity_training_volume = COALESCE(EXCLUDED.activity_training_volume, oura_daily.activity_training_volume),
+        non_wear_seconds = COALESCE(EXCLUDED.non_wear_seconds, oura_daily.non_wear_seconds),
+        inactivity_alerts = COALESCE(EXCLUDED.inactivity_alerts, oura_daily.inactivity_alerts),
+        readiness_sleep_balance = COALESCE(EXCLUDED.readiness_sleep_balance, oura_daily.readiness_sleep_balance),
+        workout_count = COALESCE(EXCLUDED.workout_count, oura_daily.workout_count),
+        workout_total_minutes = COALESCE(EXCLUDED.workout_total_minutes, oura_daily.workout_total_minutes),
+        workout_total_calories = COALESCE(EXCLUDED.workout_total_calories, oura_daily.workout_total_calories),
+        session_count = COALESCE(EXCLUDED.session_count, oura_daily.session_count),
+        session_total_minutes = COALESCE(EXCLUDED.session_total_minutes, oura_daily.session_total_minutes),
+        updated_at = NOW()
+"""
+
+
 async def normalize_daily_data(
     start_date: date,
     end_date: date,
@@ -177,367 +461,95 @@ async def normalize_daily_data(
     progress_callback: Callable[[int, int], Awaitable[None]] | None = None,
 ) -> int:
     """Normalize raw data into oura_daily table."""
-    days_processed = 0
-    current = start_date
     total_days = (end_date - start_date).days + 1
+    rows: list[dict[str, Any]] = []
 
     async with get_db_for_user(user_id) as conn:
-        while current <= end_date:
-            async with conn.cursor() as cur:
-                # Get daily_sleep data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'daily_sleep' AND day = %(day)s AND user_id = %(uid)s ORDER BY fetched_at DESC LIMIT 1",
-                    {"day": str(current), "uid": user_id},
-                )
-                sleep_row = await cur.fetchone()
-                daily_sleep_data = sleep_row["payload"] if sleep_row else {}
-
-                # Get sleep session data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'sleep' AND day = %(day)s AND user_id = %(uid)s",
-                    {"day": str(current), "uid": user_id},
-                )
-                sleep_session_rows = await cur.fetchall()
-                sleep_sessions = [
-                    row["payload"]
-                    for row in sleep_session_rows
-                    if isinstance(row.get("payload"), dict)
-                ]
-                sleep_session_data = select_primary_sleep_session(sleep_sessions)
-
-                # Get daily_readiness data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'daily_readiness' AND day = %(day)s AND user_id = %(uid)s ORDER BY fetched_at DESC LIMIT 1",
-                    {"day": str(current), "uid": user_id},
-                )
-                readiness_row = await cur.fetchone()
-                readiness_data = readiness_row["payload"] if readiness_row else {}
-
-                # Get daily_activity data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'daily_activity' AND day = %(day)s AND user_id = %(uid)s ORDER BY fetched_at DESC LIMIT 1",
-                    {"day": str(current), "uid": user_id},
-                )
-                activity_row = await cur.fetchone()
-                activity_data = activity_row["payload"] if activity_row else {}
-
-                # Get daily_stress data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'daily_stress' AND day = %(day)s AND user_id = %(uid)s ORDER BY fetched_at DESC LIMIT 1",
-                    {"day": str(current), "uid": user_id},
-                )
-                stress_row = await cur.fetchone()
-                stress_data = stress_row["payload"] if stress_row else {}
-
-                # Get daily_spo2 data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'daily_spo2' AND day = %(day)s AND user_id = %(uid)s ORDER BY fetched_at DESC LIMIT 1",
-                    {"day": str(current), "uid": user_id},
-                )
-                spo2_row = await cur.fetchone()
-                spo2_data = spo2_row["payload"] if spo2_row else {}
-
-                # Get daily_cardiovascular_age data
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'daily_cardiovascular_age' AND day = %(day)s AND user_id = %(uid)s ORDER BY fetched_at DESC LIMIT 1",
-                    {"day": str(current), "uid": user_id},
-                )
-                cardio_age_row = await cur.fetchone()
-                cardio_age_data = cardio_age_row["payload"] if cardio_age_row else {}
-
-                # Get all workout records for this day
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'workout' AND day = %(day)s AND user_id = %(uid)s",
-                    {"day": str(current), "uid": user_id},
-                )
-                workout_rows = await cur.fetchall()
+        # Load the whole range up front (two queries instead of nine per day)
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT DISTINCT ON (source, day)
+                    source,
+                    day,
+                    CASE WHEN source = 'daily_activity'
+                        THEN (payload - 'class_5_min') #- '{met,items}'
+                        ELSE payload
+                    END AS payload
+                FROM oura_raw
+                WHERE user_id = %(uid)s AND source = ANY(%(sources)s)
+                AND day BETWEEN %(start)s AND %(end)s
+                ORDER BY source, day, fetched_at DESC, id DESC
+                """,
+                {
+                    "uid": user_id,
+                    "sources": list(_LATEST_PER_DAY_SOURCES),
+                    "start": start_date,
+                    "end": end_date,
+                },
+            )
+            latest = {(row["source"], row["day"]): row["payload"] for row in await cur.fetchall()}
 
-                # Get all session records for this day
-                await cur.execute(
-                    "SELECT payload FROM oura_raw WHERE source = 'session' AND day = %(day)s AND user_id = %(uid)s",
-                    {"day": str(current), "uid": user_id},
-                )
-                session_rows = await cur.fetchall()
-
-            # Extract metrics
-            weekday = current.weekday()
-            is_weekend = weekday >= 5
-
-            month = current.month
-            if month in (3, 4, 5):
-                season = "spring"
-            elif month in (6, 7, 8):
-                season = "summer"
-            elif month in (9, 10, 11):
-                season = "fall"
-            else:
-                season = "winter"
-
-            sleep_total = sleep_session_data.get("total_sleep_duration")
-            sleep_efficiency = sleep_session_data.get("efficiency")
-            sleep_rem = sleep_session_data.get("rem_sleep_duration")
-            sleep_deep = sleep_session_data.get("deep_sleep_duration")
-            sleep_latency = sleep_session_data.get("latency")
-            sleep_restfulness = sleep_session_data.get("restless_periods")
-            sleep_score = daily_sleep_data.get("score")
-
-            hrv_average = sleep_session_data.get("average_hrv")
-            hr_lowest = sleep_session_data.get("lowest_heart_rate")
-            hr_average = sleep_session_data.get("average_heart_rate")
-
-            readiness_score = readiness_data.get("score")
-            readiness_contributors = readiness_data.get("contributors", {})
-            readiness_temp = readiness_contributors.get("body_temperature")
-            readiness_rhr = readiness_contributors.get("resting_heart_rate")
-            readiness_hrv = readiness_contributors.get("hrv_balance")
-            readiness_recovery = readiness_contributors.get("recovery_index")
-            readiness_activity = readiness_contributors.get("activity_balance")
-
-            activity_score = activity_data.get("score")
-            steps = activity_data.get("steps")
-            cal_total = activity_data.get("total_calories")
-            cal_active = activity_data.get("active_calories")
-            met_minutes = activity_data.get("met", {}).get("minutes") if isinstance(activity_data.get("met"), dict) else activity_data.get("equivalent_walking_distance")
-            low_activity = activity_data.get("low_activity_met_minutes")
-            medium_activity = activity_data.get("medium_activity_met_minutes")
-            high_activity = activity_data.get("high_activity_met_minutes")
-            sedentary = activity_data.get("sedentary_met_minutes")
-
-            stress_high_raw = stress_data.get("stress_high")
-            recovery_high_raw = stress_data.get("recovery_high")
-            stress_high = round(stress_high_raw / 60) if stress_high_raw else stress_high_raw
-            recovery_high = round(recovery_high_raw / 60) if recovery_high_raw else recovery_high_raw
-            stress_day_summary = stress_data.get("day_summary")
-
-            spo2_percentage = spo2_data.get("spo2_percentage", {})
-            spo2_average = spo2_percentage.get("average") if isinstance(spo2_percentage, dict) else None
-            if spo2_average is not None and spo2_average == 0:
-                spo2_average = None
-            breathing_disturbance = spo2_data.get("breathing_disturbance_index")
-
-            vascular_age = cardio_age_data.get("vascular_age")
-            sleep_breath_average = sleep_session_data.get("average_breath")
-
-            activity_contributors = activity_data.get("contributors", {})
-            if not isinstance(activity_contributors, dict):
-                activity_contributors = {}
-            activity_meet_daily_targets = activity_contributors.get("meet_daily_targets")
-            activity_move_every_hour = activity_contributors.get("move_every_hour")
-            activity_recovery_time = activity_contributors.get("recovery_time")
-            activity_training_frequency = activity_contributors.get("training_frequency")
-            activity_training_volume = activity_contributors.get("training_volume")
-            non_wear = activity_data.get("non_wear_minutes")
-            inactivity_alerts_val = activity_data.get("inactivity_alerts")
-
-            readiness_sleep_balance = readiness_contributors.get("sleep_balance")
-
-            # Workout aggregation
-            unique_workouts: dict[str, dict] = {}
-            for wr in workout_rows:
-                wid = wr["payload"].get("id", "")
-                if wid not in unique_workouts:
-                    unique_workouts[wid] = wr["payload"]
-            workout_count = len(unique_workouts)
-            workout_total_minutes = None
-            workout_total_calories = None
-            if workout_count > 0:
-                total_minutes = 0.0
-                total_cal = 0.0
-                for wp in unique_workouts.values():
-                    start_dt = wp.get("start_datetime")
-                    end_dt = wp.get("end_datetime")
-                    if start_dt and end_dt:
-                        try:
-                            s = datetime.fromisoformat(start_dt.replace("Z", "+00:00"))
-                            e = datetime.fromisoformat(end_dt.replace("Z", "+00:00"))
-                            total_minutes += (e - s).total_seconds() / 60
-                        except (ValueError, TypeError):
-                            pass
-                    cal = wp.get("calories", 0) or 0
-                    total_cal += cal
-                workout_total_minutes = round(total_minutes, 1) if total_minutes else None
-                workout_total_calories = round(total_cal, 1) if total_cal else None
-
-            # Session aggregation
-            unique_sessions: dict[str, dict] = {}
-            for sr in session_rows:
-                sid = sr["payload"].get("id", "")
-                if sid not in unique_sessions:
-                    unique_sessions[sid] = sr["payload"]
-            session_count = len(unique_sessions)
-            session_total_minutes = None
-            if session_count > 0:
-                total_minutes = 0.0
-                for sp in unique_sessions.values():
-                    start_dt = sp.get("start_datetime")
-                    end_dt = sp.get("end_datetime")
-                    if start_dt and end_dt:
-                        try:
-                            s = datetime.fromisoformat(start_dt.replace("Z", "+00:00"))
-                            e = datetime.fromisoformat(end_dt.replace("Z", "+00:00"))
-                            total_minutes += (e - s).total_seconds() / 60
-                        except (ValueError, TypeError):
-                            pass
-                session_total_minutes = round(total_minutes, 1) if total_minutes else None
-
-            has_data = (
-                daily_sleep_data or sleep_session_data or readiness_data
-                or activity_data or stress_data or spo2_data or cardio_age_data
+            await cur.execute(
+                """
+                SELECT
+                    source,
+                    day,
+                    CASE WHEN source = 'sleep'
+                        THEN payload - %(sleep_series)s::text[]
+                        ELSE payload
+                    END AS payload
+                FROM oura_raw
+                WHERE user_id = %(uid)s AND source = ANY(%(sources)s)
+                AND day BETWEEN %(start)s AND %(end)s
+                ORDER BY fetched_at, id
+                """,
+                {
+                    "uid": user_id,
+                    "sources": list(_ALL_PER_DAY_SOURCES),
+                    "sleep_series": list(_SLEEP_SERIES_KEYS),
+                    "start": start_date,
+                    "end": end_date,
+                },
             )
-            if has_data:
-                await conn.execute(
-                    """
-                    INSERT INTO oura_daily (
-                        user_id, date, weekday, is_weekend, season, is_holiday,
-                        sleep_total_seconds, sleep_efficiency, sleep_rem_seconds,
-                        sleep_deep_seconds, sleep_latency_seconds, sleep_restlessness, sleep_score,
-                        readiness_score, readiness_temperature_deviation, readiness_resting_heart_rate,
-                        readiness_hrv_balance, readiness_recovery_index, readiness_activity_balance,
-                        activity_score, steps, cal_total, cal_active, met_minutes,
-                        low_activity_minutes, medium_activity_minutes, high_activity_minutes, sedentary_minutes,
-                        hr_lowest, hr_average, hrv_average,
-                        stress_high_minutes, recovery_high_minutes, stress_day_summary,
-                        spo2_average, breathing_disturbance_index, vascular_age,
-                        sleep_breath_average,
-                        activity_meet_daily_targets, activity_move_every_hour,
-                        activity_recovery_time, activity_training_frequency, activity_training_volume,
-                        non_wear_seconds, inactivity_alerts,
-                        readiness_sleep_balance,
-                        workout_count, workout_total_minutes, workout_total_calories,
-                        session_count, session_total_minutes
-                    )
-                    VALUES (
-                        %(user_id)s, %(date)s, %(weekday)s, %(is_weekend)s, %(season)s, %(is_holiday)s,
-                        %(sleep_total_seconds)s, %(sleep_efficiency)s, %(sleep_rem_seconds)s,
-                        %(sleep_deep_seconds)s, %(sleep_latency_seconds)s, %(sleep_restlessness)s, %(sleep_score)s,
-                        %(readiness_score)s, %(readiness_temperature_deviation)s, %(readiness_resting_heart_rate)s,
-                        %(readiness_hrv_balance)s, %(readiness_recovery_index)s, %(readiness_activity_balance)s,
-                        %(activity_score)s, %(steps)s, %(cal_total)s, %(cal_active)s, %(met_minutes)s,
-                        %(low_activity_minutes)s, %(medium_activity_minutes)s, %(high_activity_minutes)s, %(sedentary_minutes)s,
-                        %(hr_lowest)s, %(hr_average)s, %(hrv_average)s,
-                        %(stress_high_minutes)s, %(recovery_high_minutes)s, %(stress_day_summary)s,
-                        %(spo2_average)s, %(breathing_disturbance_index)s, %(vascular_age)s,
-                        %(sleep_breath_average)s,
-                        %(activity_meet_daily_targets)s, %(activity_move_every_hour)s,
-                        %(activity_recovery_time)s, %(activity_training_frequency)s, %(activity_training_volume)s,
-                        %(non_wear_seconds)s, %(inactivity_alerts)s,
-                        %(readiness_sleep_balance)s,
-                        %(workout_count)s, %(workout_total_minutes)s, %(workout_total_calories)s,
-                        %(session_count)s, %(session_total_minutes)s
-                    )
-                    ON CONFLICT (user_id, date) DO UPDATE SET
-                        weekday = EXCLUDED.weekday,
-                        is_weekend = EXCLUDED.is_weekend,
-                        season = EXCLUDED.season,
-                        sleep_total_seconds = COALESCE(EXCLUDED.sleep_total_seconds, oura_daily.sleep_total_seconds),
-                        sleep_efficiency = COALESCE(EXCLUDED.sleep_efficiency, oura_daily.sleep_efficiency),
-                        sleep_rem_seconds = COALESCE(EXCLUDED.sleep_rem_seconds, oura_daily.sleep_rem_seconds),
-                        sleep_deep_seconds = COALESCE(EXCLUDED.sleep_deep_seconds, oura_daily.sleep_deep_seconds),
-                        sleep_latency_seconds = COALESCE(EXCLUDED.sleep_latency_seconds, oura_daily.sleep_latency_seconds),
-                        sleep_restlessness = COALESCE(EXCLUDED.sleep_restlessness, oura_daily.sleep_restlessness),
-                        sleep_score = COALESCE(EXCLUDED.sleep_score, oura_daily.sleep_score),
-                        readiness_score = COALESCE(EXCLUDED.readiness_score, oura_daily.readiness_score),
-                        readiness_temperature_deviation = COALESCE(EXCLUDED.readiness_temperature_deviation, oura_daily.readiness_temperature_deviation),
-                        readiness_resting_heart_rate = COALESCE(EXCLUDED.readiness_resting_heart_rate, oura_daily.readiness_resting_heart_rate),
-                        readiness_hrv_balance = COALESCE(EXCLUDED.readiness_hrv_balance, oura_daily.readiness_hrv_balance),
-                        readiness_recovery_index = COALESCE(EXCLUDED.readiness_recovery_index, oura_daily.readiness_recovery_index),
-                        readiness_activity_balance = COALESCE(EXCLUDED.readiness_activity_balance, oura_daily.readiness_activity_balance),
-                        activity_score = COALESCE(EXCLUDED.activity_score, oura_daily.activity_score),
-                        steps = COALESCE(EXCLUDED.steps, oura_daily.steps),
-                        cal_total = COALESCE(EXCLUDED.cal_total, oura_daily.cal_total),
-                        cal_active = COALESCE(EXCLUDED.cal_active, oura_daily.cal_active),
-                        met_minutes = COALESCE(EXCLUDED.met_minutes, oura_daily.met_minutes),
-                        low_activity_minutes = COALESCE(EXCLUDED.low_activity_minutes, oura_daily.low_activity_minutes),
-                        medium_activity_minutes = COALESCE(EXCLUDED.medium_activity_minutes, oura_daily.medium_activity_minutes),
-                        high_activity_minutes = COALESCE(EXCLUDED.high_activity_minutes, oura_daily.high_activity_minutes),
-                        sedentary_minutes = COALESCE(EXCLUDED.sedentary_minutes, oura_daily.sedentary_minutes),
-                        hr_lowest = COALESCE(EXCLUDED.hr_lowest, oura_daily.hr_lowest),
-                        hr_average = COALESCE(EXCLUDED.hr_average, oura_daily.hr_average),
-                        hrv_average = COALESCE(EXCLUDED.hrv_average, oura_daily.hrv_average),
-                        stress_high_minutes = COALESCE(EXCLUDED.stress_high_minutes, oura_daily.stress_high_minutes),
-                        recovery_high_minutes = COALESCE(EXCLUDED.recovery_high_minutes, oura_daily.recovery_high_minutes),
-                        stress_day_summary = COALESCE(EXCLUDED.stress_day_summary, oura_daily.stress_day_summary),
-                        spo2_average = COALESCE(EXCLUDED.spo2_average, oura_daily.spo2_average),
-                        breathing_disturbance_index = COALESCE(EXCLUDED.breathing_disturbance_index, oura_daily.breathing_disturbance_index),
-                        vascular_age = COALESCE(EXCLUDED.vascular_age, oura_daily.vascular_age),
-                        sleep_breath_average = COALESCE(EXCLUDED.sleep_breath_average, oura_daily.sleep_breath_average),
-                        activity_meet_daily_targets = COALESCE(EXCLUDED.activity_meet_daily_targets, oura_daily.activity_meet_daily_targets),
-                        activity_move_every_hour = COALESCE(EXCLUDED.activity_move_every_hour, oura_daily.activity_move_every_hour),
-                        activity_recovery_time = COALESCE(EXCLUDED.activity_recovery_time, oura_daily.activity_recovery_time),
-                        activity_training_frequency = COALESCE(EXCLUDED.activity_training_frequency, oura_daily.activity_training_frequency),
-                        activity_training_volume = COALESCE(EXCLUDED.activity_training_volume, oura_daily.activity_training_volume),
-                        non_wear_seconds = COALESCE(EXCLUDED.non_wear_seconds, oura_daily.non_wear_seconds),
-                        inactivity_alerts = COALESCE(EXCLUDED.inactivity_alerts, oura_daily.inactivity_alerts),
-                        readiness_sleep_balance = COALESCE(EXCLUDED.readiness_sleep_balance, oura_daily.readiness_sleep_balance),
-                        workout_count = COALESCE(EXCLUDED.workout_count, oura_daily.workout_count),
-                        workout_total_minutes = COALESCE(EXCLUDED.workout_total_minutes, oura_daily.workout_total_minutes),
-                        workout_total_calories = COALESCE(EXCLUDED.workout_total_calories, oura_daily.workout_total_calories),
-                        session_count = COALESCE(EXCLUDED.session_count, oura_daily.session_count),
-                        session_total_minutes = COALESCE(EXCLUDED.session_total_minutes, oura_daily.session_total_minutes),
-                        updated_at = NOW()
-                    """,
-                    {
-                        "user_id": user_id,
-                        "date": current,
-                        "weekday": weekday,
-                        "is_weekend": is_weekend,
-                        "season": season,
-                        "is_holiday": False,
-                        "sleep_total_seconds": sleep_total,
-                        "sleep_efficiency": sleep_efficiency,
-                        "sleep_rem_seconds": sleep_rem,
-                        "sleep_deep_seconds": sleep_deep,
-                        "sleep_latency_seconds": sleep_latency,
-                        "sleep_restlessness": sleep_restfulness,
-                        "sleep_score": sleep_score,
-                        "readiness_score": readiness_score,
-                        "readiness_temperature_deviation": readiness_temp,
-                        "readiness_resting_heart_rate": readiness_rhr,
-                        "readiness_hrv_balance": readiness_hrv,
-                        "readiness_recovery_index": readiness_recovery,
-                        "readiness_activity_balance": readiness_activity,
-                        "activity_score": activity_score,
-                        "steps": steps,
-                        "cal_total": cal_total,
-                        "cal_active": cal_active,
-                        "met_minutes": met_minutes,
-                        "low_activity_minutes": low_activity,
-                        "medium_activity_minutes": medium_activity,
-                        "high_activity_minutes": high_activity,
-                        "sedentary_minutes": sedentary,
-                        "hr_lowest": hr_lowest,
-                        "hr_average": hr_average,
-                        "hrv_average": hrv_average,
-                        "stress_high_minutes": stress_high,
-                        "recovery_high_minutes": recovery_high,
-                        "stress_day_summary": stress_day_summary,
-                        "spo2_average": spo2_average,
-                        "breathing_disturbance_index": breathing_disturbance,
-                        "vascular_age": vascular_age,
-                        "sleep_breath_average": sleep_breath_average,
-                        "activity_meet_daily_targets": activity_meet_daily_targets,
-                        "activity_move_every_hour": activity_move_every_hour,
-                        "activity_recovery_time": activity_recovery_time,
-                        "activity_training_frequency": activity_training_frequency,
-                        "activity_training_volume": activity_training_volume,
-                        "non_wear_seconds": non_wear,
-                        "inactivity_alerts": inactivity_alerts_val,
-                        "readiness_sleep_balance": readiness_sleep_balance,
-                        "workout_count": workout_count,
-                        "workout_total_minutes": workout_total_minutes,
-                        "workout_total_calories": workout_total_calories,
-                        "session_count": session_count,
-                        "session_total_minutes": session_total_minutes,
-                    },
-                )
-                days_processed += 1
+            all_records: dict[tuple[str, date], list[Any]] = defaultdict(list)
+            for row in await cur.fetchall():
+                all_records[(row["source"], row["day"])].append(row["payload"])
+
+        # Only a day with a daily record or a sleep session can produce a row
+        days_with_data = {day for _, day in latest}
+        days_with_data.update(day for source, day in all_records if source == "sleep")
+
+        for current in sorted(days_with_data):
+            sleep_sessions = [
+                payload
+                for payload in all_records.get(("sleep", current), [])
+                if isinstance(payload, dict)
+            ]
+            daily = {
+                source: latest[(source, current)]
+                for source in _LATEST_PER_DAY_SOURCES
+                if (source, current) in latest
+            }
+            row = _daily_row(
+                user_id,
+                current,
+                daily,
+                select_primary_sleep_session(sleep_sessions),
+                all_records.get(("workout", current), []),
+                all_records.get(("session", current), []),
+            )
+            if row is not None:
+                rows.append(row)
 
-            current += timedelta(days=1)
-            if progress_callback is not None:
-                processed_days = (current - start_date).days
-                await progress_callback(processed_days, total_days)
+        if rows:
+            async with conn.cursor() as cur:
+                await cur.executemany(_UPSERT_DAILY_SQL, rows)
+
+    if progress_callback is not None:
+        await progress_callback(total_days, total_days)
 
-    return days_processed
+    return len(rows)
 
 
 async def ingest_tags(
@@ -547,62 +559,63 @@ async def ingest_tags(
     progress_callback: Callable[[int, int], Awaitable[None]] | None = None,
 ) -> int:
     """Normalize tags from raw data into oura_day_tags table."""
-    tags_processed = 0
+    # A raw tag counts when it has a day and a non-empty tag_type_code or text
+    tags_cte = """
+        WITH tags AS (
+            SELECT
+                day,
+                COALESCE(
+                    NULLIF(payload->>'tag_type_code', ''),
+                    NULLIF(payload->>'text', '')
+                ) AS tag
+            FROM oura_raw
+            WHERE user_id = %(uid)s AND source = 'tag'
+            AND day BETWEEN %(start)s AND %(end)s
+        )
+    """
+    params = {"uid": user_id, "start": start_date, "end": end_date}
 
     async with get_db_for_user(user_id) as conn:
+        # Ensure tagged days exist in oura_daily first (weekday is Monday=0,
+        # as in normalize_daily_data)
+        await conn.execute(
+            tags_cte + """
+            INSERT INTO oura_daily (user_id, date, weekday, is_weekend, season, is_holiday)
+            SELECT DISTINCT
+                %(uid)s::uuid,
+                day,
+                EXTRACT(ISODOW FROM day)::int - 1,
+                EXTRACT(ISODOW FROM day) IN (6, 7),
+                CASE
+                    WHEN EXTRACT(MONTH FROM day) IN (3,4,5) THEN 'spring'
+                    WHEN EXTRACT(MONTH FROM day) IN (6,7,8) THEN 'summer'
+                    WHEN EXTRACT(MONTH FROM day) IN (9,10,11) THEN 'fall'
+                    ELSE 'winter'
+                END,
+                FALSE
+            FROM tags
+            WHERE tag IS NOT NULL
+            ON CONFLICT (user_id, date) DO NOTHING
+            """,
+            params,
+        )
+
         async with conn.cursor() as cur:
             await cur.execute(
-                "SELECT day, payload FROM oura_raw WHERE source = 'tag' AND day >= %(start)s AND day <= %(end)s AND user_id = %(uid)s",
-                {"start": str(start_date), "end": str(end_date), "uid": user_id},
-            )
-            tag_rows = await cur.fetchall()
-            total_rows = len(tag_rows)
-
-        for idx, row in enumerate(tag_rows, start=1):
-            day = row["day"]
-            payload = row["payload"]
-
-            if not day:
-                continue
-
-            tag_text = payload.get("tag_type_code") or payload.get("text")
-            if not tag_text:
-                continue
-
-            # Ensure the day exists in oura_daily first
-            await conn.execute(
-                """
-                INSERT INTO oura_daily (user_id, date, weekday, is_weekend, season, is_holiday)
-                VALUES (
-                    %(uid)s,
-                    %(date)s,
-                    EXTRACT(DOW FROM %(date)s::date)::int,
-                    EXTRACT(DOW FROM %(date)s::date) IN (0, 6),
-                    CASE
-                        WHEN EXTRACT(MONTH FROM %(date)s::date) IN (3,4,5) THEN 'spring'
-                        WHEN EXTRACT(MONTH FROM %(date)s::date) IN (6,7,8) THEN 'summer'
-                        WHEN EXTRACT(MONTH FROM %(date)s::date) IN (9,10,11) THEN 'fall'
-                        ELSE 'winter'
-                    END,
-                    FALSE
+                tags_cte + """
+                , inserted AS (
+                    INSERT INTO oura_day_tags (user_id, date, tag)
+                    SELECT DISTINCT %(uid)s::uuid, day, tag FROM tags WHERE tag IS NOT NULL
+                    ON CONFLICT (user_id, date, tag) DO NOTHING
                 )
-                ON CONFLICT (user_id, date) DO NOTHING
-                """,
-                {"uid": user_id, "date": day},
-            )
-
-            await conn.execute(
-                """
-                INSERT INTO oura_day_tags (user_id, date, tag)
-                VALUES (%(uid)s, %(date)s, %(tag)s)
-                ON CONFLICT (user_id, date, tag) DO NOTHING
+                SELECT COUNT(*) AS tags FROM tags WHERE tag IS NOT NULL
                 """,
-                {"uid": user_id, "date": day, "tag": tag_text},
+                params,
             )
-            tags_processed += 1
+            tags_processed = (await cur.fetchone())["tags"]
 
-            if progress_callback is not None:
-                await progress_callback(idx, total_rows)
+    if progress_callback is not None:
+        await progress_callback(tags_processed, tags_processed)
 
     return tags_processed
 
@@ -716,6 +729,7 @@ async def run_full_ingest_stream(
 
     async def worker() -> None:
         sync_mode = "manual"
+        personal_info_task: asyncio.Task[bool] | None = None
         try:
             await emit(
                 "progress",
@@ -753,6 +767,9 @@ async def run_full_ingest_stream(
                 )
                 return
 
+            # Independent of the daily data; runs alongside the steps below.
+            personal_info_task = asyncio.create_task(ingest_personal_info(user_id))
+
             async def raw_progress(source: str, current: int, total: int) -> None:
                 pct = _progress_percent(5, 50, current, total)
                 await emit(
@@ -834,7 +851,7 @@ async def run_full_ingest_stream(
                     message="No new days for feature recompute",
                 )
 
-            personal_info_ok = await ingest_personal_info(user_id)
+            personal_info_ok = await personal_info_task
 
             if days_processed == 0:
                 if sync_mode == "incremental":
@@ -866,6 +883,8 @@ async def run_full_ingest_stream(
         except Exception as e:
             await emit("error", message=str(e))
         finally:
+            if personal_info_task is not None and not personal_info_task.done():
+                personal_info_task.cancel()
             await queue.put({"type": "_end"})
 
     task = asyncio.create_task(worker())
@@ -902,15 +921,22 @@ async def run_full_ingest(
             "sync_mode": sync_mode,
         }
 
-    raw_counts = await ingest_raw_data(start_date, end_date, user_id)
-    days_processed = await normalize_daily_data(start_date, end_date, user_id)
-    tags_processed = await ingest_tags(start_date, end_date, user_id)
-
-    personal_info_ok = False
-    try:
-        personal_info_ok = await ingest_personal_info(user_id)
-    except Exception:
-        pass
+    async def sync_daily() -> tuple[dict[str, int], int, int]:
+        raw_counts = await ingest_raw_data(start_date, end_date, user_id)
+        days_processed = await normalize_daily_data(start_date, end_date, user_id)
+        tags_processed = await ingest_tags(start_date, end_date, user_id)
+        return raw_counts, days_processed, tags_processed
+
+    # Personal info shares nothing with the daily data, so it overlaps the
+    # whole chain. Tags stay after normalize: both write oura_daily rows for
+    # the same days and would otherwise contend on them.
+    daily_result, personal_info_result = await asyncio.gather(
+        sync_daily(), ingest_personal_info(user_id), return_exceptions=True
+    )
+    if isinstance(daily_result, BaseException):
+        raise daily_result
+    raw_counts, days_processed, tags_processed = daily_result
+    personal_info_ok = personal_info_result is True
 
     return {
         "status": "completed",
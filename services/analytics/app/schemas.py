@@ -1,10 +1,10 @@
 """Pydantic schemas mirroring the shared Zod schemas."""
 
 from datetime import date, datetime
-from typing import Any
+from typing import Annotated, Any
 from typing import Literal
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, PlainSerializer
 
 
 # ============================================
@@ -121,12 +121,21 @@ class SeriesMetricResponse(BaseModel):
 # ============================================
 
 
+# Derived statistics are computed in float64 but only shown to a few digits;
+# six significant digits in JSON keep them exact enough (and small p-values
+# intact) at about half the 17-digit repr.
+StatFloat = Annotated[
+    float,
+    PlainSerializer(lambda v: float(f"{v:.6g}"), return_type=float, when_used="json"),
+]
+
+
 class SpearmanCorrelation(BaseModel):
     """Single Spearman correlation result."""
 
     metric: str
-    rho: float
-    p_value: float
+    rho: StatFloat
+    p_value: StatFloat
     n: int
 
 
@@ -150,8 +159,8 @@ class CorrelationMatrixResponse(BaseModel):
     """Pairwise correlation matrix response."""
 
     metrics: list[str]
-    matrix: list[list[float]]
-    p_values: list[list[float]]
+    matrix: list[list[StatFloat]]
+    p_values: list[list[StatFloat]]
     n_matrix: list[list[int]]
 
 
@@ -176,8 +185,8 @@ class LaggedCorrelationPoint(BaseModel):
     """Correlation at a specific lag."""
 
     lag: int
-    rho: float
-    p_value: float
+    rho: StatFloat
+    p_value: StatFloat
     n: int
 
 
@@ -215,8 +224,8 @@ class ControlledCorrelationResponse(BaseModel):
 
     metric_x: str
     metric_y: str
-    rho: float
-    p_value: float
+    rho: StatFloat
+    p_value: StatFloat
     n: int
     controlled_for: list[str]
 
@@ -231,9 +240,9 @@ class ChangePoint(BaseModel):
 
     date: date
     index: int
-    before_mean: float
-    after_mean: float
-    magnitude: float
+    before_mean: StatFloat
+    after_mean: StatFloat
+    magnitude: StatFloat
     direction: Literal["increase", "decrease"]
 
 
@@ -258,7 +267,7 @@ class Anomaly(BaseModel):
 
     date: date
     value: float
-    z_score: float
+    z_score: StatFloat
     direction: Literal["high", "low"]
 
 
@@ -352,7 +361,7 @@ class DashboardSummary(BaseModel):
 class TrendPoint(BaseModel):
     """Point in trend data."""
 
-    date: str
+    date: date
     value: float | None
     baseline: float | None = None
 
@@ -380,7 +389,7 @@ class DashboardResponse(BaseModel):
 class HeatmapPoint(BaseModel):
     """Single day in a heatmap."""
 
-    date: str
+    date: date
     value: float | None
 
 
@@ -396,7 +405,7 @@ class HeatmapResponse(BaseModel):
 class SleepArchitectureDay(BaseModel):
     """Sleep stage percentages for a single night."""
 
-    date: str
+    date: date
     deep_pct: float | None
     rem_pct: float | None
     light_pct: float | None
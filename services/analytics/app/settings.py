@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     # Database
     database_url: str = ""
     database_url_test: str = ""
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 10
+    # Server-side prepare after this many executions of the same query
+    # (psycopg default 5; 0 prepares on first use).
+    db_prepare_threshold: int = 5
 
     # Session / Auth
     session_max_age_hours: int = 720
@@ -35,6 +40,15 @@ class Settings(BaseSettings):
     oura_api_base_url: str = "https://api.ouraring.com/v2"
     oura_auth_url: str = "https://cloud.ouraring.com/oauth/authorize"
     oura_token_url: str = "https://api.ouraring.com/oauth/token"
+    # In-flight Oura API requests per process (fetch_all fans out per type)
+    oura_max_concurrent_requests: int = 8
+
+    # Analysis cache (in-process, per user/date range)
+    analysis_cache_ttl_seconds: int = 300
+    analysis_cache_max_entries: int = 64
+    # Rendered dashboard/insights responses, keyed by ETag
+    response_cache_ttl_seconds: int = 60
+    response_cache_max_entries: int = 256
 
     # CORS
     cors_origins: str = "http://localhost:3000"
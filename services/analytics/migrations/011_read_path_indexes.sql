@@ -0,0 +1,18 @@
+-- Migration 011: Indexes for the dashboard/insights read paths.
+-- Every oura_daily read filters on user_id (RLS), so the (user_id, date)
+-- primary key already serves the date-range scans; these cover the rest.
+
+BEGIN;
+
+-- ETag data-version probe: MAX(updated_at) per user without a row scan
+CREATE INDEX IF NOT EXISTS idx_oura_daily_user_updated
+    ON oura_daily(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_oura_features_daily_user_updated
+    ON oura_features_daily(user_id, updated_at);
+
+-- Chronotype: latest long_sleep nights per user, skipping naps in the index
+CREATE INDEX IF NOT EXISTS idx_oura_raw_user_long_sleep_day
+    ON oura_raw(user_id, day DESC)
+    WHERE source = 'sleep' AND payload->>'type' = 'long_sleep';
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- Migration 012: Materialize the sleep fields the chronotype reads use.
+-- Sleep payloads carry large hypnogram/HR arrays; reading three short
+-- strings from them meant detoasting the whole JSONB document per row.
+
+BEGIN;
+
+ALTER TABLE oura_raw
+    ADD COLUMN IF NOT EXISTS sleep_type TEXT
+        GENERATED ALWAYS AS (CASE WHEN source = 'sleep' THEN payload->>'type' END) STORED,
+    ADD COLUMN IF NOT EXISTS bedtime_start TEXT
+        GENERATED ALWAYS AS (CASE WHEN source = 'sleep' THEN payload->>'bedtime_start' END) STORED,
+    ADD COLUMN IF NOT EXISTS bedtime_end TEXT
+        GENERATED ALWAYS AS (CASE WHEN source = 'sleep' THEN payload->>'bedtime_end' END) STORED;
+
+-- Replaces the payload-expression partial index from 011
+DROP INDEX IF EXISTS idx_oura_raw_user_long_sleep_day;
+CREATE INDEX IF NOT EXISTS idx_oura_raw_user_long_sleep_day
+    ON oura_raw(user_id, day DESC)
+    WHERE sleep_type = 'long_sleep';
+
+COMMIT;
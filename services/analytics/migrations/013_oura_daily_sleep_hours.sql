@@ -0,0 +1,15 @@
+-- Migration 013: Sleep durations in hours as stored generated columns.
+-- The heatmap and dashboard read sleep in hours; storing the conversion
+-- turns their per-row seconds / 3600.0 arithmetic into plain column reads.
+
+BEGIN;
+
+ALTER TABLE oura_daily
+    ADD COLUMN IF NOT EXISTS sleep_total_hours DOUBLE PRECISION
+        GENERATED ALWAYS AS ((sleep_total_seconds / 3600.0)::double precision) STORED,
+    ADD COLUMN IF NOT EXISTS sleep_deep_hours DOUBLE PRECISION
+        GENERATED ALWAYS AS ((sleep_deep_seconds / 3600.0)::double precision) STORED,
+    ADD COLUMN IF NOT EXISTS sleep_rem_hours DOUBLE PRECISION
+        GENERATED ALWAYS AS ((sleep_rem_seconds / 3600.0)::double precision) STORED;
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- Migration 014: Index normalization's latest-payload-per-day reads.
+-- DISTINCT ON (source, day) ... ORDER BY fetched_at DESC, id DESC can walk
+-- this index in order instead of sorting every raw row in the range. It
+-- covers the same leading columns as idx_oura_raw_user_source_day, which
+-- is dropped. payload is not INCLUDEd: sleep payloads exceed the btree
+-- row size limit.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_oura_raw_user_source_day_fetched
+    ON oura_raw(user_id, source, day, fetched_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_oura_raw_user_source_day;
+
+COMMIT;
@@ -0,0 +1,25 @@
+-- Migration 015: Store each distinct raw payload once per user/source/day.
+-- Overlapping syncs re-fetch the same records; every copy was kept, growing
+-- oura_raw and every per-day scan over it. A re-fetched identical payload
+-- now only bumps fetched_at on the existing row, so it still counts as the
+-- latest fetch for normalization.
+
+BEGIN;
+
+ALTER TABLE oura_raw
+    ADD COLUMN IF NOT EXISTS payload_md5 TEXT
+        GENERATED ALWAYS AS (md5(payload::text)) STORED;
+
+-- Keep the most recent fetch of each duplicated payload
+DELETE FROM oura_raw older
+USING oura_raw newer
+WHERE newer.user_id = older.user_id
+  AND newer.source = older.source
+  AND newer.day IS NOT DISTINCT FROM older.day
+  AND newer.payload_md5 = older.payload_md5
+  AND (newer.fetched_at, newer.id) > (older.fetched_at, older.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_oura_raw_user_source_day_payload
+    ON oura_raw(user_id, source, day, payload_md5) NULLS NOT DISTINCT;
+
+COMMIT;
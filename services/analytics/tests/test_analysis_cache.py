@@ -0,0 +1,40 @@
+"""Unit tests for the in-process analysis cache."""
+
+from app.analysis import cache as cache_module
+from app.analysis.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set(("u1", 1), "a")
+    cache.set(("u1", 2), "b")
+    assert cache.get(("u1", 1)) == "a"
+
+    cache.set(("u1", 3), "c")
+
+    assert cache.get(("u1", 2)) is None
+    assert cache.get(("u1", 1)) == "a"
+    assert cache.get(("u1", 3)) == "c"
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=4, ttl_seconds=10)
+    cache.set(("u1",), "a")
+
+    now[0] += 5
+    assert cache.get(("u1",)) == "a"
+    now[0] += 6
+    assert cache.get(("u1",)) is None
+
+
+def test_ttl_cache_invalidate_user_is_scoped():
+    cache = TTLCache()
+    cache.set(("u1", None, None), "a")
+    cache.set(("u2", None, None), "b")
+
+    cache.invalidate_user("u1")
+
+    assert cache.get(("u1", None, None)) is None
+    assert cache.get(("u2", None, None)) == "b"
@@ -0,0 +1,205 @@
+"""Unit tests for correlation analysis functions."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from app.analysis.correlations import (
+    compute_controlled_correlation,
+    compute_correlation_matrix,
+    compute_lagged_correlations,
+    compute_spearman_correlations,
+    get_ranks,
+    load_analysis_data,
+)
+from app.analysis import correlations
+from tests.conftest import register_and_login
+
+
+def _make_frame(n: int = 60, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=n)
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n).date,
+        "target": base,
+        "pos": base * 2 + rng.normal(scale=0.5, size=n),
+        "neg": -base + rng.normal(scale=0.8, size=n),
+        "noise": rng.normal(size=n),
+        "sparse": rng.normal(size=n),
+    })
+    df.loc[::3, "sparse"] = np.nan
+    df.loc[[1, 4, 9], "target"] = np.nan
+    return df
+
+
+def test_spearman_matches_pairwise_scipy():
+    df = _make_frame()
+    candidates = ["pos", "neg", "noise", "sparse"]
+
+    result = {r["metric"]: r for r in compute_spearman_correlations(df, "target", candidates)}
+
+    for candidate in candidates:
+        mask = df["target"].notna() & df[candidate].notna()
+        rho, p_value = stats.spearmanr(df.loc[mask, "target"], df.loc[mask, candidate])
+        assert result[candidate]["rho"] == pytest.approx(rho)
+        assert result[candidate]["p_value"] == pytest.approx(p_value)
+        assert result[candidate]["n"] == int(mask.sum())
+
+
+def test_spearman_sorted_and_skips_unknown_or_sparse():
+    df = _make_frame()
+    df["too_sparse"] = np.nan
+    df.loc[:5, "too_sparse"] = 1.0
+
+    result = compute_spearman_correlations(
+        df, "target", ["missing", "target", "too_sparse", "noise", "pos"]
+    )
+
+    assert [r["metric"] for r in result] == ["pos", "noise"]
+    assert compute_spearman_correlations(df, "missing", ["pos"]) == []
+
+
+def test_correlation_matrix_matches_pairwise_scipy():
+    df = _make_frame()
+    df["too_sparse"] = np.nan
+    df.loc[:5, "too_sparse"] = 1.0
+    metrics = ["target", "pos", "sparse", "too_sparse", "missing"]
+
+    result = compute_correlation_matrix(df, metrics)
+
+    assert result["metrics"] == ["target", "pos", "sparse", "too_sparse"]
+    for a, x_name in enumerate(result["metrics"]):
+        assert result["matrix"][a][a] == 1.0
+        assert result["n_matrix"][a][a] == int(df[x_name].notna().sum())
+        for b, y_name in enumerate(result["metrics"]):
+            if a == b:
+                continue
+            mask = df[x_name].notna() & df[y_name].notna()
+            assert result["n_matrix"][a][b] == int(mask.sum())
+            if mask.sum() < 10:
+                assert result["matrix"][a][b] == 0.0
+                continue
+            rho, p_value = stats.spearmanr(df.loc[mask, x_name], df.loc[mask, y_name])
+            assert result["matrix"][a][b] == pytest.approx(rho)
+            assert result["p_values"][a][b] == pytest.approx(p_value)
+
+
+def test_get_ranks_uses_complete_cases_and_is_memoized():
+    df = _make_frame()
+
+    ranks = get_ranks(df, ["target", "sparse"])
+
+    complete = df[["target", "sparse"]].dropna()
+    np.testing.assert_array_equal(ranks, stats.rankdata(complete.to_numpy(), axis=0))
+    assert get_ranks(df, ["target", "sparse"]) is ranks
+
+    key = id(df)
+    del df
+    assert key not in correlations._rank_cache
+
+
+def test_lagged_pairs_x_with_later_y():
+    df = _make_frame(n=80)
+    # y follows x two days later
+    df["follower"] = df["pos"].shift(2)
+
+    result = compute_lagged_correlations(df, "pos", "follower", max_lag=4)
+
+    assert result["best_lag"] == 2
+    by_lag = {r["lag"]: r for r in result["lags"]}
+    assert by_lag[2]["rho"] == pytest.approx(1.0)
+    for lag, entry in by_lag.items():
+        x = df["pos"].iloc[: len(df) - lag].to_numpy()
+        y = df["follower"].iloc[lag:].to_numpy()
+        mask = ~np.isnan(x) & ~np.isnan(y)
+        rho, p_value = stats.spearmanr(x[mask], y[mask])
+        assert entry["rho"] == pytest.approx(rho)
+        assert entry["p_value"] == pytest.approx(p_value, abs=1e-12)
+        assert entry["n"] == int(mask.sum())
+
+
+def test_lagged_handles_missing_columns_and_negative_lag():
+    df = _make_frame()
+
+    assert compute_lagged_correlations(df, "pos", "missing")["lags"] == []
+    assert compute_lagged_correlations(df, "pos", "neg", max_lag=-1)["lags"] == []
+
+
+def test_controlled_single_control_matches_closed_form():
+    df = _make_frame(n=80)
+
+    result = compute_controlled_correlation(df, "pos", "neg", ["noise"])
+
+    clean = df[["pos", "neg", "noise"]].dropna()
+    r = clean.corr(method="spearman")
+    r_xy, r_xz, r_yz = r.loc["pos", "neg"], r.loc["pos", "noise"], r.loc["neg", "noise"]
+    expected = (r_xy - r_xz * r_yz) / np.sqrt((1 - r_xz**2) * (1 - r_yz**2))
+    dof = len(clean) - 3
+    t = expected * np.sqrt(dof / (1 - expected**2))
+    assert result["rho"] == pytest.approx(expected)
+    assert result["p_value"] == pytest.approx(2 * stats.t.sf(abs(t), dof))
+    assert result["n"] == len(clean)
+
+
+def test_controlled_ignores_constant_controls():
+    df = _make_frame(n=80)
+    df["constant"] = 1.0
+
+    with_constant = compute_controlled_correlation(df, "pos", "neg", ["noise", "constant"])
+    without = compute_controlled_correlation(df, "pos", "neg", ["noise"])
+
+    assert with_constant["rho"] == pytest.approx(without["rho"])
+    assert with_constant["controlled_for"] == ["noise", "constant"]
+
+
+async def test_load_analysis_data_keeps_daily_date_without_features(client, db_conn):
+    user = await register_and_login(client, "frame@example.com", "password123")
+    for day in range(1, 4):
+        await db_conn.execute(
+            """
+            INSERT INTO oura_daily (user_id, date, weekday, is_weekend, sleep_score, steps)
+            VALUES (%s, %s, 0, false, %s, %s)
+            """,
+            (user["user_id"], f"2025-03-0{day}", 70 + day, 1000 * day),
+        )
+    await db_conn.commit()
+
+    df = await load_analysis_data(user["user_id"])
+
+    assert not df.columns.duplicated().any()
+    assert [str(d) for d in df["date"]] == ["2025-03-01", "2025-03-02", "2025-03-03"]
+    assert list(df["steps"]) == [1000, 2000, 3000]
+
+
+def test_lagged_clamps_huge_max_lag():
+    df = _make_frame(n=40)
+
+    result = compute_lagged_correlations(df, "pos", "neg", max_lag=1_000_000)
+
+    assert [r["lag"] for r in result["lags"]] == list(range(31))
+    assert min(r["n"] for r in result["lags"]) >= 10
+
+
+def test_lagged_counts_lag_in_days_across_missing_dates():
+    df = _make_frame(n=80)
+    df["follower"] = df["pos"].shift(2)
+    gappy = df.drop(index=[20, 21, 22, 50])
+
+    result = compute_lagged_correlations(gappy, "pos", "follower", max_lag=4)
+
+    assert result["best_lag"] == 2
+    assert {r["lag"]: r for r in result["lags"]}[2]["rho"] == pytest.approx(1.0)
+
+
+def test_controlled_rejects_singular_inputs():
+    df = _make_frame(n=80)
+    df["pos_copy"] = df["pos"]
+
+    for result in (
+        compute_controlled_correlation(df, "pos", "neg", ["pos"]),
+        compute_controlled_correlation(df, "pos", "pos", ["noise"]),
+        compute_controlled_correlation(df, "pos", "neg", ["pos_copy"]),
+    ):
+        assert result["rho"] == 0
+        assert result["p_value"] == 1
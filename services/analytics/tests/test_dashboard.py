@@ -0,0 +1,303 @@
+"""Tests for dashboard and insights endpoints."""
+
+import json
+from datetime import date, timedelta
+
+from app import main
+from tests.conftest import auth_headers, register_and_login
+
+
+async def _insert_days(db_conn, user_id: str, days: int = 5):
+    """Insert `days` consecutive oura_daily rows ending today."""
+    today = date.today()
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        await db_conn.execute(
+            """
+            INSERT INTO oura_daily (
+                user_id, date, weekday, is_weekend, readiness_score, sleep_score,
+                steps, sleep_total_seconds, sleep_deep_seconds, sleep_rem_seconds
+            )
+            VALUES (%s, %s, %s, %s, %s, 80, %s, 28800, 7200, 5400)
+            """,
+            (user_id, day, day.weekday(), day.weekday() >= 5, 70 + offset, 1000 * offset),
+        )
+    await db_conn.commit()
+
+
+async def _connect_oura(db_conn, user_id: str):
+    await db_conn.execute(
+        """
+        INSERT INTO oura_auth (user_id, access_token, refresh_token, expires_at)
+        VALUES (%s, 'fake_access', 'fake_refresh', NOW() + INTERVAL '1 hour')
+        """,
+        (user_id,),
+    )
+    await db_conn.commit()
+
+
+async def test_dashboard_not_connected(client, db_conn):
+    user = await register_and_login(client, "dash-new@example.com", "password123")
+    await _insert_days(db_conn, user["user_id"])
+
+    res = await client.get("/dashboard?days=7", headers=auth_headers(user["token"]))
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["connected"] is False
+    assert body["trends"] == []
+
+
+async def test_dashboard_summary_and_trends(client, db_conn):
+    user = await register_and_login(client, "dash@example.com", "password123")
+    await _connect_oura(db_conn, user["user_id"])
+    await _insert_days(db_conn, user["user_id"], days=5)
+
+    res = await client.get("/dashboard?days=7", headers=auth_headers(user["token"]))
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["connected"] is True
+    assert body["summary"]["readiness_avg"] == 72.0
+    assert body["summary"]["sleep_hours_avg"] == 8.0
+    assert body["summary"]["days_with_data"] == 5
+
+    trends = {t["name"]: t["data"] for t in body["trends"]}
+    assert [p["value"] for p in trends["readiness"]] == [74.0, 73.0, 72.0, 71.0, 70.0]
+    assert trends["readiness"][-1]["date"] == str(date.today())
+    assert trends["hrv"][0]["value"] is None
+
+
+async def test_dashboard_etag_round_trip(client, db_conn):
+    user = await register_and_login(client, "dash-etag@example.com", "password123")
+    await _connect_oura(db_conn, user["user_id"])
+    await _insert_days(db_conn, user["user_id"], days=3)
+    headers = auth_headers(user["token"])
+
+    first = await client.get("/dashboard?days=7", headers=headers)
+    etag = first.headers["etag"]
+
+    cached = await client.get("/dashboard?days=7", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    other_params = await client.get("/dashboard?days=30", headers={**headers, "If-None-Match": etag})
+    assert other_params.status_code == 200
+
+    await db_conn.execute(
+        "UPDATE oura_daily SET readiness_score = 99 WHERE user_id = %s AND date = %s",
+        (user["user_id"], date.today()),
+    )
+    await db_conn.commit()
+    changed = await client.get("/dashboard?days=7", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+async def test_dashboard_is_gzipped(client, db_conn):
+    user = await register_and_login(client, "dash-gzip@example.com", "password123")
+    await _connect_oura(db_conn, user["user_id"])
+    await _insert_days(db_conn, user["user_id"], days=7)
+
+    res = await client.get(
+        "/dashboard?days=7",
+        headers={**auth_headers(user["token"]), "Accept-Encoding": "gzip"},
+    )
+
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.json()["summary"]["days_with_data"] == 7
+
+
+async def test_insights_etag_is_per_user(client, db_conn):
+    alice = await register_and_login(client, "etag-a@example.com", "password123")
+    bob = await register_and_login(client, "etag-b@example.com", "password123")
+
+    res = await client.get("/insights/chronotype", headers=auth_headers(alice["token"]))
+    etag = res.headers["etag"]
+
+    other = await client.get(
+        "/insights/chronotype",
+        headers={**auth_headers(bob["token"]), "If-None-Match": etag},
+    )
+    assert other.status_code == 200
+
+
+async def test_heatmap_values_and_range(client, db_conn):
+    user = await register_and_login(client, "heatmap@example.com", "password123")
+    await _insert_days(db_conn, user["user_id"], days=4)
+
+    res = await client.get(
+        "/insights/heatmap?metric=readiness_score&days=30",
+        headers=auth_headers(user["token"]),
+    )
+
+    assert res.status_code == 200
+    body = res.json()
+    assert [p["value"] for p in body["data"]] == [73.0, 72.0, 71.0, 70.0]
+    assert body["min_value"] == 70.0
+    assert body["max_value"] == 73.0
+
+
+async def test_heatmap_sleep_metrics_in_hours(client, db_conn):
+    user = await register_and_login(client, "heatmap-sleep@example.com", "password123")
+    await _insert_days(db_conn, user["user_id"], days=2)
+    headers = auth_headers(user["token"])
+
+    for metric, hours in [
+        ("sleep_total_seconds", 8.0),
+        ("sleep_deep_seconds", 2.0),
+        ("sleep_rem_seconds", 1.5),
+    ]:
+        res = await client.get(f"/insights/heatmap?metric={metric}&days=30", headers=headers)
+
+        assert res.status_code == 200
+        body = res.json()
+        assert [p["value"] for p in body["data"]] == [hours, hours]
+        assert body["min_value"] == body["max_value"] == hours
+
+
+async def _insert_long_sleep(db_conn, user_id: str, day: date, start: str, end: str):
+    await db_conn.execute(
+        """
+        INSERT INTO oura_daily (user_id, date, weekday, is_weekend)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT DO NOTHING
+        """,
+        (user_id, day, day.weekday(), day.weekday() >= 5),
+    )
+    await db_conn.execute(
+        """
+        INSERT INTO oura_raw (user_id, source, day, payload)
+        VALUES (%s, 'sleep', %s, %s)
+        """,
+        (
+            user_id,
+            day,
+            json.dumps({"type": "long_sleep", "bedtime_start": start, "bedtime_end": end}),
+        ),
+    )
+
+
+async def test_chronotype_uses_local_sleep_midpoints(client, db_conn):
+    user = await register_and_login(client, "chrono@example.com", "password123")
+    saturday = date(2025, 3, 8)
+    # Weekend: 01:00-09:00 local (+01:00) -> midpoint 05:00 (29.0h)
+    await _insert_long_sleep(
+        db_conn, user["user_id"], saturday,
+        "2025-03-08T01:00:00+01:00", "2025-03-08T09:00:00+01:00",
+    )
+    # Weekdays: 23:00-07:00 local -> midpoint 03:00 (27.0h); one in UTC "Z" form
+    await _insert_long_sleep(
+        db_conn, user["user_id"], date(2025, 3, 4),
+        "2025-03-03T23:00:00+01:00", "2025-03-04T07:00:00+01:00",
+    )
+    await _insert_long_sleep(
+        db_conn, user["user_id"], date(2025, 3, 5),
+        "2025-03-04T23:30:00Z", "2025-03-05T06:30:00Z",
+    )
+    await db_conn.commit()
+
+    res = await client.get("/insights/chronotype", headers=auth_headers(user["token"]))
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["weekend_midpoint"] == "05:00"
+    assert body["weekday_midpoint"] == "03:00"
+    assert body["social_jetlag_minutes"] == 120
+    assert body["chronotype"] == "intermediate"
+
+
+async def test_chronotype_skips_malformed_bedtimes(client, db_conn):
+    user = await register_and_login(client, "chrono-bad@example.com", "password123")
+    await _insert_long_sleep(
+        db_conn, user["user_id"], date(2025, 3, 8), "not-a-time", "2025-03-08T09:00:00+01:00",
+    )
+    await _insert_long_sleep(
+        db_conn, user["user_id"], date(2025, 3, 4),
+        "2025-03-03T23:00:00+01:00", "2025-03-04T07:00:00+01:00",
+    )
+    await db_conn.commit()
+
+    res = await client.get("/insights/chronotype", headers=auth_headers(user["token"]))
+
+    assert res.status_code == 200
+    assert res.json()["chronotype"] == "unknown"
+
+
+async def test_sleep_architecture_percentages_and_averages(client, db_conn):
+    user = await register_and_login(client, "arch@example.com", "password123")
+    await _insert_days(db_conn, user["user_id"], days=3)
+    await db_conn.execute(
+        """
+        UPDATE oura_daily SET sleep_deep_seconds = NULL, sleep_total_seconds = 25200
+        WHERE user_id = %s AND date = %s
+        """,
+        (user["user_id"], date.today()),
+    )
+    await db_conn.commit()
+
+    res = await client.get("/insights/sleep-architecture?days=30", headers=auth_headers(user["token"]))
+
+    assert res.status_code == 200
+    body = res.json()
+    assert [d["date"] for d in body["data"]] == [
+        str(date.today() - timedelta(days=offset)) for offset in (2, 1, 0)
+    ]
+    older, today = body["data"][0], body["data"][-1]
+    # 28800s night with 7200s deep / 5400s REM; SQL ROUND is half away from zero
+    assert (older["deep_pct"], older["rem_pct"], older["light_pct"]) == (25.0, 18.8, 56.3)
+    assert older["total_hours"] == 8.0
+    # Missing deep seconds count as zero
+    assert (today["deep_pct"], today["rem_pct"], today["light_pct"]) == (0.0, 21.4, 78.6)
+    assert today["total_hours"] == 7.0
+    assert body["avg_deep_pct"] == 16.7
+    assert body["avg_rem_pct"] == 19.7
+    assert body["avg_light_pct"] == 63.7
+
+
+async def test_heatmap_etag_is_per_metric_and_window(client, db_conn):
+    user = await register_and_login(client, "heatmap-etag@example.com", "password123")
+    await _insert_days(db_conn, user["user_id"], days=2)
+    headers = auth_headers(user["token"])
+
+    first = await client.get("/insights/heatmap?metric=steps&days=30", headers=headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    repeat = await client.get(
+        "/insights/heatmap?metric=steps&days=30", headers={**headers, "If-None-Match": etag}
+    )
+    assert repeat.status_code == 304
+
+    for query in ("metric=sleep_score&days=30", "metric=steps&days=60"):
+        other = await client.get(
+            f"/insights/heatmap?{query}", headers={**headers, "If-None-Match": etag}
+        )
+        assert other.status_code == 200
+
+
+async def test_insights_reuse_cached_rendering_for_same_etag(client, db_conn, monkeypatch):
+    user = await register_and_login(client, "insights-cache@example.com", "password123")
+    await _insert_days(db_conn, user["user_id"], days=2)
+    headers = auth_headers(user["token"])
+    url = "/insights/sleep-architecture?days=30"
+
+    first = await client.get(url, headers=headers)
+
+    def _no_db(*args, **kwargs):
+        raise AssertionError("endpoint body should not run on a cache hit")
+
+    monkeypatch.setattr(main, "get_db_for_user", _no_db)
+    cached = await client.get(url, headers=headers)
+    assert cached.status_code == 200
+    assert cached.json() == first.json()
+    assert cached.headers["etag"] == first.headers["etag"]
+
+    monkeypatch.undo()
+    await db_conn.execute(
+        "UPDATE oura_daily SET sleep_rem_seconds = 0 WHERE user_id = %s", (user["user_id"],)
+    )
+    await db_conn.commit()
+    refreshed = await client.get(url, headers=headers)
+    assert refreshed.json()["avg_rem_pct"] == 0.0
@@ -0,0 +1,90 @@
+"""Tests for the feature engineering pipeline."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.pipelines.features import _feature_values, compute_features_frame, recompute_features
+from tests.conftest import register_and_login
+
+
+def _daily_frame(readiness: list[float | None]) -> pd.DataFrame:
+    index = pd.date_range("2025-01-01", periods=len(readiness), name="date")
+    return pd.DataFrame(
+        {
+            "readiness_score": readiness,
+            "sleep_total_seconds": [28800] * len(readiness),
+            "hrv_average": None,
+        },
+        index=index,
+    )
+
+
+def test_features_frame_uses_prior_observations_only():
+    df = _daily_frame([60, 62, 64, 66, 68, 70, 72, 74, 90])
+
+    day = _feature_values(compute_features_frame(df).iloc[-1])
+
+    assert day["rm_3_readiness_score"] == 72.0
+    assert day["rm_7_readiness_score"] == 68.0
+    assert day["delta_readiness_vs_rm7"] == 22.0
+    assert day["sd_7_readiness_score"] == pytest.approx(np.std([62, 64, 66, 68, 70, 72, 74], ddof=1))
+    assert day["trend_7_readiness_score"] == pytest.approx(2.0)
+    assert day["lag_1_readiness_score"] == 74
+    assert day["lag_7_sleep_total_seconds"] == 28800
+    assert day["sd_7_sleep_total_seconds"] == 0.0
+    assert not any(name.endswith("hrv_average") for name in day)
+
+
+def test_features_frame_handles_missing_values_and_calendar_gaps():
+    df = _daily_frame([70, 72, None, 74, 78])
+    df = df.drop(df.index[3])
+
+    frame = compute_features_frame(df)
+    last = _feature_values(frame.iloc[-1])
+
+    assert last["rm_3_readiness_score"] == 71.0
+    # Day -1 has no row and day -2 has no reading; lags are calendar days
+    assert "lag_1_readiness_score" not in last
+    assert "lag_2_readiness_score" not in last
+    assert last["lag_3_readiness_score"] == 72
+    # A day without a reading reuses its latest observed day's windows
+    assert "rm_3_readiness_score" not in _feature_values(frame.iloc[2])
+    assert _feature_values(frame.iloc[0]) == {}
+
+
+async def test_recompute_features_upserts_range(client, db_conn):
+    user = await register_and_login(client, "features@example.com", "password123")
+    for offset in range(10):
+        day = date.today() - timedelta(days=offset)
+        await db_conn.execute(
+            """
+            INSERT INTO oura_daily (user_id, date, weekday, is_weekend, readiness_score)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (user["user_id"], day, day.weekday(), day.weekday() >= 5, 70 + offset),
+        )
+    await db_conn.commit()
+    start = date.today() - timedelta(days=30)
+    progress: list[tuple[int, int]] = []
+
+    async def on_progress(current: int, total: int) -> None:
+        progress.append((current, total))
+
+    first = await recompute_features(start, date.today(), user["user_id"], on_progress)
+    again = await recompute_features(start, date.today(), user["user_id"])
+
+    # The oldest day has no history, so it gets no feature row
+    assert first == again == 9
+    assert progress[-1] == (31, 31)
+    cur = await db_conn.execute(
+        """
+        SELECT rm_7_readiness_score, lag_1_readiness_score, rm_28_readiness_score
+        FROM oura_features_daily WHERE user_id = %s AND date = %s
+        """,
+        (user["user_id"], date.today()),
+    )
+    rm_7, lag_1, rm_28 = (await cur.fetchone()).values()
+    assert (float(rm_7), lag_1, rm_28) == (74.0, 71, None)
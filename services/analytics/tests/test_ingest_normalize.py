@@ -0,0 +1,220 @@
+"""Tests for storing raw Oura records and normalizing them into oura_daily."""
+
+import asyncio
+import json
+from datetime import date
+
+from app.oura.client import OuraAPIError
+from app.pipelines import ingest
+from app.pipelines.ingest import ingest_raw_data, normalize_daily_data
+from tests.conftest import register_and_login
+
+
+async def _insert_raw(db_conn, user_id: str, source: str, day: date, payload: dict, fetched_at: str):
+    await db_conn.execute(
+        """
+        INSERT INTO oura_raw (user_id, source, day, payload, fetched_at)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        (user_id, source, day, json.dumps(payload), fetched_at),
+    )
+
+
+async def test_normalize_uses_latest_fetch_and_dedupes_workouts(client, db_conn):
+    user = await register_and_login(client, "normalize@example.com", "password123")
+    uid = user["user_id"]
+    day, next_day = date(2025, 3, 4), date(2025, 3, 5)
+
+    await _insert_raw(db_conn, uid, "daily_readiness", day, {"score": 60}, "2025-03-04T08:00:00Z")
+    await _insert_raw(db_conn, uid, "daily_readiness", day, {"score": 75}, "2025-03-04T12:00:00Z")
+    await _insert_raw(db_conn, uid, "daily_readiness", next_day, {"score": 81}, "2025-03-05T08:00:00Z")
+    await _insert_raw(
+        db_conn, uid, "daily_activity", day,
+        {"score": 80, "steps": 9000, "class_5_min": "0123", "met": {"interval": 60, "items": [1.2]}},
+        "2025-03-04T08:00:00Z",
+    )
+    await _insert_raw(
+        db_conn, uid, "sleep", day,
+        {"type": "late_nap", "total_sleep_duration": 1800}, "2025-03-04T08:00:00Z",
+    )
+    await _insert_raw(
+        db_conn, uid, "sleep", day,
+        {
+            "type": "long_sleep",
+            "total_sleep_duration": 27000,
+            "average_hrv": 42,
+            "hrv": {"interval": 300, "items": [40, 44]},
+        },
+        "2025-03-04T08:00:00Z",
+    )
+    workout = {
+        "id": "w1",
+        "start_datetime": "2025-03-04T17:00:00Z",
+        "end_datetime": "2025-03-04T17:45:00Z",
+        "calories": 300,
+    }
+    # Re-fetched later with updated calories; the latest copy counts once
+    await _insert_raw(db_conn, uid, "workout", day, {**workout, "calories": 320}, "2025-03-04T21:00:00Z")
+    await _insert_raw(db_conn, uid, "workout", day, workout, "2025-03-04T20:00:00Z")
+    await _insert_raw(
+        db_conn, uid, "session", next_day,
+        {
+            "id": "s1",
+            "start_datetime": "2025-03-05T07:00:00+01:00",
+            "end_datetime": "2025-03-05T07:10:00+01:00",
+        },
+        "2025-03-05T08:00:00Z",
+    )
+    await db_conn.commit()
+
+    days = await normalize_daily_data(day, date(2025, 3, 6), uid)
+
+    assert days == 2
+    cur = await db_conn.execute(
+        """
+        SELECT date, season, readiness_score, activity_score, steps, sleep_total_seconds, hrv_average,
+               workout_count, workout_total_minutes, workout_total_calories,
+               session_count, session_total_minutes
+        FROM oura_daily WHERE user_id = %s ORDER BY date
+        """,
+        (uid,),
+    )
+    first, second = await cur.fetchall()
+    assert first["season"] == "spring"
+    assert first["readiness_score"] == 75
+    assert (first["activity_score"], first["steps"]) == (80, 9000)
+    assert first["sleep_total_seconds"] == 27000
+    assert float(first["hrv_average"]) == 42.0
+    assert first["workout_count"] == 1
+    assert float(first["workout_total_minutes"]) == 45.0
+    assert float(first["workout_total_calories"]) == 320.0
+    assert second["readiness_score"] == 81
+    assert second["sleep_total_seconds"] is None
+    assert (second["session_count"], float(second["session_total_minutes"])) == (1, 10.0)
+
+
+async def test_ingest_raw_data_stores_each_fetched_record(client, db_conn, monkeypatch):
+    user = await register_and_login(client, "ingest-raw@example.com", "password123")
+    uid = user["user_id"]
+
+    async def fake_fetch_all(start_date, end_date, user_id, kinds):
+        return {
+            "daily_readiness": [
+                {"day": "2025-03-04", "score": 70},
+                {"day": "2025-03-05", "score": 72},
+            ],
+            "sleep": [{"bedtime_end": "2025-03-05T07:00:00+01:00", "type": "long_sleep"}],
+            "tag": OuraAPIError(500, "Server error"),
+        }
+
+    monkeypatch.setattr(ingest.oura_client, "fetch_all", fake_fetch_all)
+
+    counts = await ingest_raw_data(
+        date(2025, 3, 4), date(2025, 3, 5), uid, ["daily_readiness", "sleep", "tag", "workout"]
+    )
+
+    assert counts == {"daily_readiness": 2, "sleep": 1, "tag": 0}
+    cur = await db_conn.execute(
+        "SELECT source, day, payload FROM oura_raw WHERE user_id = %s ORDER BY id", (uid,)
+    )
+    rows = await cur.fetchall()
+    assert [(r["source"], str(r["day"])) for r in rows] == [
+        ("daily_readiness", "2025-03-04"),
+        ("daily_readiness", "2025-03-05"),
+        ("sleep", "2025-03-05"),
+    ]
+    assert rows[1]["payload"]["score"] == 72
+
+
+async def test_ingest_raw_data_refetch_keeps_one_row_per_payload(client, db_conn, monkeypatch):
+    user = await register_and_login(client, "ingest-refetch@example.com", "password123")
+    uid = user["user_id"]
+    readiness = [{"day": "2025-03-04", "score": 70}]
+
+    async def fake_fetch_all(start_date, end_date, user_id, kinds):
+        return {"daily_readiness": readiness}
+
+    monkeypatch.setattr(ingest.oura_client, "fetch_all", fake_fetch_all)
+
+    await ingest_raw_data(date(2025, 3, 4), date(2025, 3, 4), uid, ["daily_readiness"])
+    cur = await db_conn.execute("SELECT fetched_at FROM oura_raw WHERE user_id = %s", (uid,))
+    first_fetch = (await cur.fetchone())["fetched_at"]
+    await db_conn.commit()
+
+    await ingest_raw_data(date(2025, 3, 4), date(2025, 3, 4), uid, ["daily_readiness"])
+    readiness = [{"day": "2025-03-04", "score": 75}]
+    await ingest_raw_data(date(2025, 3, 4), date(2025, 3, 4), uid, ["daily_readiness"])
+
+    cur = await db_conn.execute(
+        "SELECT payload, fetched_at FROM oura_raw WHERE user_id = %s ORDER BY id", (uid,)
+    )
+    rows = await cur.fetchall()
+    assert [r["payload"]["score"] for r in rows] == [70, 75]
+    assert rows[0]["fetched_at"] > first_fetch
+
+
+async def test_ingest_tags_creates_days_and_skips_untagged_records(client, db_conn):
+    user = await register_and_login(client, "ingest-tags@example.com", "password123")
+    uid = user["user_id"]
+    sunday = date(2025, 3, 9)
+
+    for day, payload in [
+        (sunday, {"id": "t1", "tag_type_code": "alcohol"}),
+        (sunday, {"id": "t2", "tag_type_code": "alcohol"}),
+        (sunday, {"tag_type_code": "", "text": "late meal"}),
+        (sunday, {"tag_type_code": None}),
+        (date(2025, 4, 1), {"text": "outside the range"}),
+    ]:
+        await _insert_raw(db_conn, uid, "tag", day, payload, "2025-03-09T21:00:00Z")
+    await db_conn.commit()
+
+    tagged = await ingest.ingest_tags(date(2025, 3, 1), date(2025, 3, 31), uid)
+
+    assert tagged == 3
+    cur = await db_conn.execute(
+        "SELECT date, tag FROM oura_day_tags WHERE user_id = %s ORDER BY tag", (uid,)
+    )
+    assert [(r["date"], r["tag"]) for r in await cur.fetchall()] == [
+        (sunday, "alcohol"),
+        (sunday, "late meal"),
+    ]
+    cur = await db_conn.execute(
+        "SELECT date, weekday, is_weekend, season FROM oura_daily WHERE user_id = %s", (uid,)
+    )
+    assert await cur.fetchall() == [
+        {"date": sunday, "weekday": 6, "is_weekend": True, "season": "spring"}
+    ]
+
+
+async def test_run_full_ingest_overlaps_personal_info(monkeypatch):
+    events: list[str] = []
+    personal_info_started = asyncio.Event()
+
+    async def fake_raw(start_date, end_date, user_id):
+        await asyncio.wait_for(personal_info_started.wait(), timeout=1)
+        events.append("raw")
+        return {"sleep": 1}
+
+    async def fake_normalize(start_date, end_date, user_id):
+        events.append("normalize")
+        return 2
+
+    async def fake_tags(start_date, end_date, user_id):
+        events.append("tags")
+        return 3
+
+    async def failing_personal_info(user_id):
+        personal_info_started.set()
+        raise RuntimeError("personal info unavailable")
+
+    monkeypatch.setattr(ingest, "ingest_raw_data", fake_raw)
+    monkeypatch.setattr(ingest, "normalize_daily_data", fake_normalize)
+    monkeypatch.setattr(ingest, "ingest_tags", fake_tags)
+    monkeypatch.setattr(ingest, "ingest_personal_info", failing_personal_info)
+
+    result = await ingest.run_full_ingest(date(2025, 3, 1), date(2025, 3, 2), "user-1")
+
+    assert events == ["raw", "normalize", "tags"]
+    assert result["raw_counts"] == {"sleep": 1}
+    assert (result["days_processed"], result["tags_processed"]) == (2, 3)
+    assert result["personal_info"] is False
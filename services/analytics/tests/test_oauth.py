@@ -1,8 +1,11 @@
 """Tests for OAuth state management and token security."""
 
+import asyncio
+
 import pytest
 
-from app.oura.auth import consume_oauth_state, get_auth_url
+from app.oura import auth as oura_auth
+from app.oura.auth import consume_oauth_state, get_auth_url, store_tokens
 from tests.conftest import auth_headers, register_and_login
 
 
@@ -96,3 +99,60 @@ async def test_exchange_validates_state(client):
     )
     assert res.status_code == 400
     assert "Invalid or expired OAuth state" in res.json()["detail"]
+
+
+async def test_oauth_status_reports_connection_and_email(client, db_conn):
+    """Status combines the token record with the stored Oura email."""
+    user = await register_and_login(client, "oauth_status@example.com", "password123")
+    headers = auth_headers(user["token"])
+
+    res = await client.get("/auth/oura/status", headers=headers)
+    assert res.json()["connected"] is False
+
+    await store_tokens(
+        {
+            "access_token": "access",
+            "refresh_token": "refresh",
+            "expires_in": 3600,
+            "scope": "daily heartrate",
+        },
+        user["user_id"],
+    )
+    await db_conn.execute(
+        "INSERT INTO oura_personal_info (user_id, email) VALUES (%s, 'ring@example.com')",
+        (user["user_id"],),
+    )
+    await db_conn.commit()
+
+    res = await client.get("/auth/oura/status", headers=headers)
+    body = res.json()
+    assert body["connected"] is True
+    assert body["scopes"] == ["daily", "heartrate"]
+    assert body["oura_email"] == "ring@example.com"
+
+
+async def test_access_token_refreshed_once_under_concurrency(client, monkeypatch):
+    """Concurrent callers share one refresh, then hit the in-process cache."""
+    user = await register_and_login(client, "oauth_refresh@example.com", "password123")
+    await store_tokens(
+        {"access_token": "stale", "refresh_token": "refresh-1", "expires_in": 60},
+        user["user_id"],
+    )
+    refreshes = []
+
+    async def fake_refresh(refresh_token):
+        refreshes.append(refresh_token)
+        await asyncio.sleep(0.01)
+        return {"access_token": "fresh", "refresh_token": "refresh-2", "expires_in": 3600}
+
+    monkeypatch.setattr(oura_auth, "refresh_access_token", fake_refresh)
+
+    tokens = await asyncio.gather(
+        *(oura_auth.get_valid_access_token(user["user_id"]) for _ in range(5))
+    )
+    assert tokens == ["fresh"] * 5
+    assert refreshes == ["refresh-1"]
+
+    await oura_auth.clear_auth(user["user_id"])
+    with pytest.raises(oura_auth.OAuthError):
+        await oura_auth.get_valid_access_token(user["user_id"])
@@ -0,0 +1,95 @@
+"""Tests for the Oura API client."""
+
+import asyncio
+from datetime import date
+
+import httpx
+import pytest
+
+from app.oura.client import OuraAPIError, OuraClient, OuraRateLimitError
+
+
+def _client_with_responses(monkeypatch, responses: list[httpx.Response]):
+    """OuraClient whose HTTP calls return `responses` in order, without backoff."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return responses[len(calls) - 1]
+
+    async def fake_token(user_id):
+        return f"token-{user_id}"
+
+    monkeypatch.setattr("app.oura.client.get_valid_access_token", fake_token)
+    client = OuraClient()
+    client.base_delay = 0
+    client._client = httpx.AsyncClient(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client, calls
+
+
+async def test_request_retries_server_errors(monkeypatch):
+    client, calls = _client_with_responses(
+        monkeypatch,
+        [httpx.Response(502), httpx.Response(200, json={"data": [1]})],
+    )
+
+    result = await client._request("GET", "/usercollection/tag", "user-1")
+
+    assert result == {"data": [1]}
+    assert len(calls) == 2
+    assert calls[0].url.path.endswith("/v2/usercollection/tag")
+    assert calls[0].headers["Authorization"] == "Bearer token-user-1"
+
+
+async def test_request_gives_up_after_max_retries(monkeypatch):
+    client, calls = _client_with_responses(
+        monkeypatch, [httpx.Response(429, headers={"Retry-After": "0"})] * 4
+    )
+
+    with pytest.raises(OuraRateLimitError):
+        await client._request("GET", "/usercollection/tag", "user-1")
+    assert len(calls) == client.max_retries + 1
+
+
+async def test_request_does_not_retry_client_errors(monkeypatch):
+    client, calls = _client_with_responses(monkeypatch, [httpx.Response(404, text="nope")])
+
+    with pytest.raises(OuraAPIError) as exc_info:
+        await client._request("GET", "/usercollection/tag", "user-1")
+    assert exc_info.value.status_code == 404
+    assert len(calls) == 1
+
+
+async def test_fetch_all_runs_types_concurrently(monkeypatch):
+    client = OuraClient()
+    in_flight = 0
+    peak = 0
+
+    async def fake_fetch(start_date, end_date, user_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [{"day": str(start_date)}]
+
+    async def failing_fetch(start_date, end_date, user_id):
+        raise OuraAPIError(500, "Server error")
+
+    monkeypatch.setattr(client, "fetch_daily_sleep", fake_fetch)
+    monkeypatch.setattr(client, "fetch_daily_activity", fake_fetch)
+    monkeypatch.setattr(client, "fetch_tags", failing_fetch)
+
+    results = await client.fetch_all(
+        date(2025, 1, 1),
+        date(2025, 1, 2),
+        "user-1",
+        ["daily_sleep", "daily_activity", "tag", "not_a_type"],
+    )
+
+    assert list(results) == ["daily_sleep", "daily_activity", "tag"]
+    assert results["daily_sleep"] == [{"day": "2025-01-01"}]
+    assert isinstance(results["tag"], OuraAPIError)
+    assert peak == 2
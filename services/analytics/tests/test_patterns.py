@@ -0,0 +1,147 @@
+"""Unit tests for pattern detection functions."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analysis import patterns
+from app.analysis.patterns import (
+    cluster_weeks,
+    detect_anomalies,
+    detect_change_points,
+    load_weekly_data,
+)
+from tests.conftest import register_and_login
+
+
+def test_detect_change_points_finds_level_shifts_across_gaps():
+    rng = np.random.default_rng(0)
+    series = np.concatenate([
+        rng.normal(60, 2, 150), rng.normal(70, 2, 150), rng.normal(62, 2, 200),
+    ])
+    series[[0, 40, 41, 499]] = np.nan
+
+    change_points = detect_change_points(series, penalty=10.0)
+
+    assert [cp["index"] for cp in change_points] == [150, 300]
+    assert all(type(cp["index"]) is int for cp in change_points)
+    assert change_points[0]["direction"] == "increase"
+    assert change_points[1]["direction"] == "decrease"
+    assert change_points[0]["before_mean"] == pytest.approx(60, abs=1)
+    assert detect_change_points(np.full(20, np.nan)) == []
+
+
+def test_detect_change_points_is_not_limited_to_multiples_of_five():
+    rng = np.random.default_rng(3)
+    series = np.concatenate([rng.normal(60, 2, 153), rng.normal(75, 2, 120)])
+
+    # rpt.Pelt(model="rbf", min_size=5) with its default jump=5 reported [155, 273]
+    assert [cp["index"] for cp in detect_change_points(series)] == [153]
+
+
+def _series_with_spikes() -> np.ndarray:
+    rng = np.random.default_rng(3)
+    series = 60 + rng.normal(scale=2.0, size=120)
+    series[[10, 70]] = [95.0, 20.0]
+    series[[5, 50]] = np.nan
+    return series
+
+
+def test_detect_anomalies_flags_spikes_in_both_directions():
+    series = _series_with_spikes()
+
+    anomalies = detect_anomalies(series, threshold=3.0)
+
+    by_index = {a["index"]: a for a in anomalies}
+    assert by_index[10]["direction"] == "high"
+    assert by_index[10]["value"] == 95.0
+    assert by_index[70]["direction"] == "low"
+    assert all(not np.isnan(a["value"]) for a in anomalies)
+    assert all(type(a["index"]) is int and type(a["z_score"]) is float for a in anomalies)
+
+
+def test_robust_z_scores_matches_numpy_reference():
+    series = _series_with_spikes()
+    valid = series[~np.isnan(series)]
+    median = np.median(valid)
+    mad = np.median(np.abs(valid - median))
+    expected = 0.6745 * (series - median) / (mad + 1e-10)
+
+    z_scores = patterns._robust_z_scores(series, valid)
+
+    np.testing.assert_allclose(z_scores, expected, equal_nan=True)
+
+
+async def test_load_weekly_data_aggregates_by_iso_week(client, db_conn):
+    user = await register_and_login(client, "weekly@example.com", "password123")
+    # 2024-12-30 (Mon) .. 2025-01-12 (Sun): ISO weeks 2025-W01 and 2025-W02
+    start = date(2024, 12, 30)
+    for offset in range(14):
+        day = start + timedelta(days=offset)
+        await db_conn.execute(
+            """
+            INSERT INTO oura_daily (user_id, date, weekday, is_weekend, steps, sleep_score)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            (
+                user["user_id"], day, day.weekday(), day.weekday() >= 5,
+                1000 * (offset // 7 + 1), None if offset == 0 else 80,
+            ),
+        )
+    await db_conn.commit()
+
+    weekly = await load_weekly_data(["steps", "sleep_score", "bad name"], user["user_id"])
+
+    assert list(weekly.columns) == ["year", "week", "steps", "sleep_score"]
+    assert weekly[["year", "week"]].values.tolist() == [[2025, 1], [2025, 2]]
+    assert weekly["steps"].tolist() == [1000.0, 2000.0]
+    assert weekly["sleep_score"].tolist() == [80.0, 80.0]
+
+
+def test_cluster_weeks_builds_weeks_and_profiles():
+    rng = np.random.default_rng(5)
+    n = 24
+    weekly = pd.DataFrame({
+        "year": [2025] * n,
+        "week": list(range(1, n + 1)),
+        "avg_sleep": np.repeat([6.0, 8.0], n // 2) + rng.normal(scale=0.1, size=n),
+        "avg_steps": np.repeat([4000.0, 12000.0], n // 2) + rng.normal(scale=50, size=n),
+    })
+
+    result = cluster_weeks(weekly, ["avg_sleep", "avg_steps", "missing"], n_clusters=2)
+
+    weeks = result["weeks"]
+    assert [w["week"] for w in weeks] == list(range(1, n + 1))
+    assert all(type(w["year"]) is int and type(w["cluster"]) is int for w in weeks)
+    assert len({w["cluster"] for w in weeks[: n // 2]}) == 1
+    low = str(weeks[0]["cluster"])
+    assert result["cluster_profiles"][low]["avg_sleep"] == pytest.approx(
+        weekly["avg_sleep"].iloc[: n // 2].mean()
+    )
+    assert set(result["cluster_profiles"]) == {"0", "1"}
+
+
+async def test_weekly_clusters_cached_per_user_until_invalidated(monkeypatch):
+    loads = []
+
+    async def fake_load(features, user_id, start_date=None, end_date=None):
+        loads.append(user_id)
+        return pd.DataFrame({
+            "year": [2025] * 4,
+            "week": [1, 2, 3, 4],
+            "avg_sleep": [6.0, 6.1, 8.0, 8.1],
+        })
+
+    monkeypatch.setattr(patterns, "load_weekly_data", fake_load)
+    monkeypatch.setattr(patterns, "_cluster_cache", patterns.TTLCache())
+
+    first = await patterns.get_weekly_clusters(["avg_sleep"], 2, user_id="u1")
+    assert await patterns.get_weekly_clusters(["avg_sleep"], 2, user_id="u1") is first
+    await patterns.get_weekly_clusters(["avg_sleep"], 2, user_id="u2")
+    assert loads == ["u1", "u2"]
+
+    patterns.invalidate_user_pattern_cache("u1")
+    await patterns.get_weekly_clusters(["avg_sleep"], 2, user_id="u1")
+    assert loads == ["u1", "u2", "u1"]